@@ -2,6 +2,7 @@
 オセロAI 自作関数集
 
 このパッケージには複数種類のオセロAI実装が含まれています。
+探索エンジン群などは最初に参照されたときに、定義しているモジュールを読み込みます（遅延読み込み）。
 
 基本AI群:
 - myai_greedy_simple: 基本AI（石数最大化）
@@ -15,6 +16,11 @@
 - myai_adaptive_depth: 適応的探索AI
 - myai_strategic: 戦略的AI（最強）
 
+探索エンジン群:
+- myai_ponder: 先読みAI（相手の手番中も探索し、置換表を次の手で再利用）
+- myai_mcts: モンテカルロ木探索AI（UCT/PUCT）
+- myai_selective: 選択的探索AI（ProbCutで枝刈りして深く読む）
+
 エイリアス:
 - myai: myai_positional（サイト互換性用）
 
@@ -24,6 +30,14 @@
 - minimax: ミニマックス探索関数
 - count_stable_stones: 確定石カウント関数
 - get_eval_table: 局面別評価表取得関数
+- generate_eval_table: 任意サイズの評価表生成関数
+- get_blended_eval_table: 空きマス数ごとに補間した評価表取得関数
+- SearchEngine: 置換表付き反復深化探索エンジン
+- Ponderer: 先読み付き思考エンジン
+- stop_pondering: myai_ponderの先読み停止
+- MCTS: 配列でノードを管理するモンテカルロ木探索
+- EngineConfig: 置換表・探索木・キャッシュのメモリ上限の設定
+- memory_report: 構造ごとのメモリ使用量の計測
 """
 
 from .myai import (
@@ -49,8 +63,45 @@ from .myai import (
     minimax,
     count_stable_stones,
     get_eval_table,
+    generate_eval_table,
+    get_blended_eval_table,
 )
 
+# 公開名 → 定義しているモジュール名
+# 探索エンジンやスレッド関連のモジュールは、最初にその名前が参照されたときに読み込む（PEP 562）。
+# myai_positional などの基本AIだけを使う場合、これらのモジュールは読み込まれない。
+_LAZY_ATTRS = {
+    # 探索エンジン群
+    'myai_ponder': 'ponder',
+    'myai_mcts': 'mcts',
+    'myai_selective': 'search',
+
+    # 内部関数（上級者用）
+    'SearchEngine': 'search',
+    'Ponderer': 'ponder',
+    'stop_pondering': 'ponder',
+    'MCTS': 'mcts',
+    'EngineConfig': 'engine_config',
+    'memory_report': 'engine_config',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+    module = importlib.import_module(f".{module_name}", __name__)
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
+
 __version__ = "2.3.0"
 __author__ = "ttk1010"
 
@@ -68,6 +119,11 @@ __all__ = [
     'myai_adaptive_depth',
     'myai_strategic',
 
+    # 探索エンジン群
+    'myai_ponder',
+    'myai_mcts',
+    'myai_selective',
+
     # エイリアス
     'myai',
     'myai_best',
@@ -78,4 +134,12 @@ __all__ = [
     'minimax',
     'count_stable_stones',
     'get_eval_table',
+    'generate_eval_table',
+    'get_blended_eval_table',
+    'SearchEngine',
+    'Ponderer',
+    'stop_pondering',
+    'MCTS',
+    'EngineConfig',
+    'memory_report',
 ]
@@ -0,0 +1,370 @@
+"""
+ベンチマーク
+
+- 起動時間: 新しいPythonプロセスでパッケージを読み込む時間を計測し、予算と比較
+- 思考時間: 固定の局面集（コーパス）に対する各AIの1手あたりの時間を計測
+- 評価関数: 局面集に対する評価関数1回あたりの時間を計測
+- 探索トレース: 決定的モード（ノード数上限・シード固定）で局面集を探索し、
+  深さごとの PV とノード数を記録。保存したトレースと比較して、
+  探索結果を変えないはずの最適化でノード数が変わっていないかを確認する
+
+使い方:
+    python benchmark.py
+    python benchmark.py --players myai_positional myai_minimax_shallow --json bench.json
+    python benchmark.py --no-startup --trace trace.json            # トレースを保存
+    python benchmark.py --no-startup --check-trace trace.json      # 保存したトレースと比較
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    from .movegen import legal_moves, place
+    from .othello_utils import create_initial_board, copy
+except ImportError:
+    from movegen import legal_moves, place
+    from othello_utils import create_initial_board, copy
+
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PACKAGE_NAME = os.path.basename(PACKAGE_DIR)
+
+# 起動時間の予算（ミリ秒、インタプリタ自体の起動時間は含まない）
+STARTUP_BUDGET_MS = {
+    "package": 15.0,          # import <package>（myai.py を含む）
+    "myai_positional": 15.0,  # from <package> import myai_positional
+    "all": 60.0,              # from <package> import *
+}
+
+STARTUP_STATEMENTS = {
+    "package": "import {pkg}",
+    "myai_positional": "from {pkg} import myai_positional",
+    "all": "from {pkg} import *",
+}
+
+# 探索トレースの既定値
+TRACE_NODE_LIMIT = 20000
+TRACE_SEED = 0
+
+DEFAULT_PLAYERS = [
+    "myai_positional",
+    "myai_positional_improved",
+    "myai_minimax_shallow",
+    "myai_adaptive_depth",
+]
+
+
+def make_corpus(board_size=6, count=20, seed=0):
+    """
+    ランダムな対局から局面集を作成（同じ引数なら常に同じ局面集）
+
+    Args:
+        board_size: ボードサイズ
+        count: 局面数
+        seed: 乱数のシード
+
+    Returns:
+        list: (ボード, 手番の色) のリスト（手番の色に有効な手がある局面のみ）
+    """
+    rng = random.Random(seed)
+    corpus = []
+    while len(corpus) < count:
+        board = create_initial_board(board_size)
+        color = 1
+        stop_at = rng.randrange(board_size * board_size - 4)
+        for _ in range(stop_at):
+            moves = legal_moves(board, color)
+            if not moves:
+                color = 3 - color
+                moves = legal_moves(board, color)
+                if not moves:
+                    break
+            place(board, color, *rng.choice(moves))
+            color = 3 - color
+        if legal_moves(board, color):
+            corpus.append((board, color))
+        elif legal_moves(board, 3 - color):
+            corpus.append((board, 3 - color))
+    return corpus
+
+
+def measure_startup(statement, repeats=5):
+    """
+    新しいPythonプロセスで statement の実行時間を計測
+
+    Args:
+        statement: 計測するimport文
+        repeats: 繰り返し回数
+
+    Returns:
+        float: 実行時間の中央値（ミリ秒）
+    """
+    code = (
+        "import sys, time\n"
+        f"sys.path.insert(0, {os.path.dirname(PACKAGE_DIR)!r})\n"
+        "start = time.perf_counter()\n"
+        f"{statement}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+    )
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                                text=True, check=True).stdout
+        samples.append(float(output.strip()))
+    return statistics.median(samples)
+
+
+def bench_startup(repeats=5):
+    """
+    起動時間を計測して予算と比較
+
+    Args:
+        repeats: 繰り返し回数
+
+    Returns:
+        dict: {名前: {"ms": 計測値, "budget_ms": 予算, "ok": 予算内か}}
+    """
+    results = {}
+    for name, statement in STARTUP_STATEMENTS.items():
+        ms = measure_startup(statement.format(pkg=PACKAGE_NAME), repeats)
+        budget = STARTUP_BUDGET_MS[name]
+        results[name] = {"ms": round(ms, 3), "budget_ms": budget, "ok": ms <= budget}
+    return results
+
+
+def bench_player(player, corpus):
+    """
+    局面集に対するAIの1手あたりの思考時間を計測
+
+    Args:
+        player: AI関数
+        corpus: make_corpus() の結果
+
+    Returns:
+        dict: {"mean_ms": 平均, "max_ms": 最大, "moves": 手数}
+    """
+    times = []
+    for board, color in corpus:
+        board = copy(board)
+        start = time.perf_counter()
+        player(board, color)
+        times.append((time.perf_counter() - start) * 1000)
+    return {"mean_ms": round(statistics.mean(times), 3), "max_ms": round(max(times), 3),
+            "moves": len(times)}
+
+
+def bench_eval(corpus, repeats=200):
+    """
+    局面集に対する評価関数1回あたりの時間を計測
+
+    Args:
+        corpus: make_corpus() の結果
+        repeats: 局面ごとの繰り返し回数
+
+    Returns:
+        dict: {"evaluate_board_us": 2次元配列版, "evaluate_position_us": 1次元配列版,
+               "calls": 呼び出し回数}（時間はマイクロ秒）
+    """
+    try:
+        from .myai import evaluate_board, evaluate_position, get_blended_eval_table
+        from .movegen import flatten
+    except ImportError:
+        from myai import evaluate_board, evaluate_position, get_blended_eval_table
+        from movegen import flatten
+
+    calls = len(corpus) * repeats
+    start = time.perf_counter()
+    for board, color in corpus:
+        for _ in range(repeats):
+            evaluate_board(board, color)
+    board_us = (time.perf_counter() - start) / calls * 1e6
+
+    prepared = [(flatten(board), color, get_blended_eval_table(len(board), len(board[0])))
+                for board, color in corpus]
+    start = time.perf_counter()
+    for cells, color, table in prepared:
+        for _ in range(repeats):
+            evaluate_position(cells, color, table)
+    position_us = (time.perf_counter() - start) / calls * 1e6
+
+    return {"evaluate_board_us": round(board_us, 3), "evaluate_position_us": round(position_us, 3),
+            "calls": calls}
+
+
+def bench_trace(corpus, node_limit=TRACE_NODE_LIMIT, seed=TRACE_SEED, selective=False):
+    """
+    決定的モードで局面集を探索し、探索トレースを作成
+
+    局面ごとに新しい探索エンジンを使うため、結果は実行順や実行環境によらない。
+
+    Args:
+        corpus: make_corpus() の結果
+        node_limit: 1局面あたりの探索ノード数の上限
+        seed: 置換表の手の次に試す手の順を決めるシード
+        selective: ProbCut による選択的探索を行うか
+
+    Returns:
+        dict: {"node_limit", "seed", "selective", "positions": 局面ごとの結果のリスト,
+               "total_nodes": 総ノード数, "ms": 探索時間}
+    """
+    try:
+        from .search import SearchEngine
+    except ImportError:
+        from search import SearchEngine
+
+    positions = []
+    start = time.perf_counter()
+    for board, color in corpus:
+        engine = SearchEngine(selective=selective, seed=seed)
+        result = engine.search(board, color, node_limit=node_limit)
+        positions.append({
+            "board": "".join(str(cell) for row in board for cell in row),
+            "color": color,
+            "move": list(result.move) if result.move is not None else None,
+            "score": result.score,
+            "depth": result.depth,
+            "depths": engine.trace,
+        })
+    ms = (time.perf_counter() - start) * 1000
+    total_nodes = sum(depth["nodes"] for position in positions for depth in position["depths"])
+    return {"node_limit": node_limit, "seed": seed, "selective": selective,
+            "positions": positions, "total_nodes": total_nodes, "ms": round(ms, 3)}
+
+
+def compare_traces(baseline, current):
+    """
+    2つの探索トレースを比較
+
+    Args:
+        baseline: 基準のトレース（bench_trace() の結果）
+        current: 比較するトレース
+
+    Returns:
+        list: 差分の説明（一致すれば空）
+    """
+    differences = []
+    for key in ("node_limit", "seed", "selective"):
+        if baseline.get(key) != current.get(key):
+            differences.append(f"{key}: {baseline.get(key)} -> {current.get(key)}")
+    if len(baseline["positions"]) != len(current["positions"]):
+        differences.append(f"positions: {len(baseline['positions'])} -> {len(current['positions'])}")
+    for index, (old, new) in enumerate(zip(baseline["positions"], current["positions"])):
+        if old["board"] != new["board"] or old["color"] != new["color"]:
+            differences.append(f"#{index}: different position")
+            continue
+        for key in ("move", "score", "depth"):
+            if old[key] != new[key]:
+                differences.append(f"#{index} {key}: {old[key]} -> {new[key]}")
+        for old_depth, new_depth in zip(old["depths"], new["depths"]):
+            for key in ("nodes", "pv"):
+                if old_depth.get(key) != new_depth.get(key):
+                    differences.append(f"#{index} depth {old_depth['depth']} {key}: "
+                                       f"{old_depth.get(key)} -> {new_depth.get(key)}")
+    return differences
+
+
+# AI関数を定義しているモジュール（探す順）
+PLAYER_MODULES = ("myai", "search", "mcts", "ponder")
+
+
+def resolve_players(names):
+    """
+    myai_* 関数名のリストからAI関数の辞書を作成
+
+    myai.py のほか、探索エンジン群（myai_selective・myai_mcts・myai_ponder）も探す。
+    """
+    players = {}
+    for name in names:
+        for module_name in PLAYER_MODULES:
+            if __package__:
+                # パッケージの属性 myai はエイリアスの関数なので、モジュールとして読み込む
+                module = importlib.import_module(f".{module_name}", __package__)
+            else:
+                module = importlib.import_module(module_name)
+            if callable(getattr(module, name, None)):
+                players[name] = getattr(module, name)
+                break
+        else:
+            raise ValueError(f"unknown player: {name!r}")
+    return players
+
+
+def main(argv=None):
+    """コマンドラインのエントリポイント"""
+    parser = argparse.ArgumentParser(description="オセロAI ベンチマーク")
+    parser.add_argument("--players", nargs="*", default=DEFAULT_PLAYERS, help="計測するAI関数名")
+    parser.add_argument("--size", type=int, default=6, help="ボードサイズ")
+    parser.add_argument("--positions", type=int, default=20, help="局面数")
+    parser.add_argument("--seed", type=int, default=0, help="局面集の乱数シード")
+    parser.add_argument("--repeats", type=int, default=5, help="起動時間の計測回数")
+    parser.add_argument("--no-startup", action="store_true", help="起動時間を計測しない")
+    parser.add_argument("--json", default=None, help="結果を書き出すJSONファイル")
+    parser.add_argument("--node-limit", type=int, default=TRACE_NODE_LIMIT,
+                        help="探索トレースの1局面あたりのノード数上限")
+    parser.add_argument("--trace", default=None, help="探索トレースを書き出すJSONファイル")
+    parser.add_argument("--check-trace", default=None, help="比較する探索トレースのJSONファイル")
+    args = parser.parse_args(argv)
+
+    report = {}
+    if not args.no_startup:
+        report["startup"] = bench_startup(args.repeats)
+        print("=== 起動時間 ===")
+        for name, result in report["startup"].items():
+            status = "OK" if result["ok"] else "OVER"
+            print(f"{name:20s} {result['ms']:8.2f} ms  (予算 {result['budget_ms']:.1f} ms) {status}")
+
+    corpus = make_corpus(args.size, args.positions, args.seed)
+    report["players"] = {}
+    print("=== 思考時間 ===")
+    for name, player in resolve_players(args.players).items():
+        result = bench_player(player, corpus)
+        report["players"][name] = result
+        print(f"{name:28s} 平均 {result['mean_ms']:9.2f} ms  最大 {result['max_ms']:9.2f} ms")
+
+    report["eval"] = bench_eval(corpus)
+    print("=== 評価関数 ===")
+    print(f"evaluate_board      {report['eval']['evaluate_board_us']:8.2f} us/回")
+    print(f"evaluate_position   {report['eval']['evaluate_position_us']:8.2f} us/回")
+
+    trace = bench_trace(corpus, args.node_limit)
+    report["trace"] = {"total_nodes": trace["total_nodes"], "ms": trace["ms"]}
+    print("=== 探索トレース ===")
+    print(f"総ノード数 {trace['total_nodes']}  ({trace['ms']:.1f} ms, "
+          f"{trace['total_nodes'] / max(trace['ms'], 1e-9):.1f} ノード/ms)")
+    if args.trace:
+        with open(args.trace, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=1)
+
+    trace_ok = True
+    if args.check_trace:
+        with open(args.check_trace, encoding="utf-8") as f:
+            differences = compare_traces(json.load(f), trace)
+        trace_ok = not differences
+        report["trace"]["differences"] = differences
+        if trace_ok:
+            print(f"{args.check_trace} と一致")
+        else:
+            print(f"{args.check_trace} との差分 {len(differences)} 件:")
+            for difference in differences[:20]:
+                print(f"  {difference}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if not all(result["ok"] for result in report.get("startup", {}).values()):
+        return 1
+    if not trace_ok:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""
+対局エンジンサーバーのクライアント
+
+server.py をサブプロセスとして起動し、標準入出力の JSON Lines で通信する。
+対局サイトや対局管理プログラムの代わりとして、ローカルでの動作確認や
+負荷試験（loadtest.py）に使う。
+"""
+
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+
+
+SERVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+
+class EngineClient:
+    """
+    server.py を起動して通信するクライアント
+
+    複数のスレッドから同時に request_batch() を呼び出してよい。
+    """
+
+    def __init__(self, workers=None, max_games=None, python=None, worker_mb=None):
+        command = [python or sys.executable, SERVER_PATH]
+        if workers is not None:
+            command += ["--workers", str(workers)]
+        if max_games is not None:
+            command += ["--max-games", str(max_games)]
+        if worker_mb is not None:
+            command += ["--worker-mb", str(worker_mb)]
+        self._process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            text=True, encoding="utf-8", bufsize=1)
+        self._ids = itertools.count(1)
+        self._responses = {}
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def request_batch(self, requests):
+        """
+        複数のリクエストを1行にまとめて送り、すべてのレスポンスを待つ
+
+        Args:
+            requests: リクエストの辞書のリスト（"id" は自動で付与される）
+
+        Returns:
+            list: リクエストと同じ順のレスポンスのリスト
+        """
+        requests = [dict(request, id=next(self._ids)) for request in requests]
+        with self._write_lock:
+            self._process.stdin.write(json.dumps(requests, separators=(",", ":")) + "\n")
+            self._process.stdin.flush()
+
+        responses = []
+        with self._cond:
+            for request in requests:
+                while request["id"] not in self._responses:
+                    if self._process.poll() is not None:
+                        raise RuntimeError("engine server exited")
+                    self._cond.wait(timeout=1.0)
+                responses.append(self._responses.pop(request["id"]))
+        return responses
+
+    def best_move(self, board, color, game="", player="search", time_budget=None, node_limit=None):
+        """
+        1局面の最善手を問い合わせる
+
+        Args:
+            board: 2次元配列のオセロボード
+            color: 手番の色
+            game: 対局ID
+            player: "search" または myai_* 関数名
+            time_budget: 制限時間（秒、Noneならサーバーの既定値）
+            node_limit: 探索ノード数の上限（指定すると制限時間の既定値は使わない）
+
+        Returns:
+            dict: レスポンス
+        """
+        request = {"game": game, "board": board, "color": color, "player": player}
+        if time_budget is not None:
+            request["time_budget"] = time_budget
+        if node_limit is not None:
+            request["node_limit"] = node_limit
+        return self.request_batch([request])[0]
+
+    def end_game(self, game):
+        """対局の終了を通知し、サーバー側の置換表を破棄させる"""
+        return self.request_batch([{"game": game, "end": True}])[0]
+
+    def close(self):
+        """サーバーを終了させる"""
+        if self._process.stdin and not self._process.stdin.closed:
+            self._process.stdin.close()
+        self._process.wait()
+        self._reader.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _read(self):
+        for line in self._process.stdout:
+            response = json.loads(line)
+            with self._cond:
+                self._responses[response.get("id")] = response
+                self._cond.notify_all()
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,319 @@
+"""
+エンジンのメモリ設定とメモリ使用量の計測
+
+置換表・探索木・評価表などのキャッシュは、1つの EngineConfig で
+それぞれバイト単位の上限を指定する。上限を超えそうになると古いものから捨てる。
+
+- tt_bytes: SearchEngine 1つあたりの置換表
+- mcts_bytes: MCTS 1つあたりの探索木
+- table_cache_bytes: プロセス全体で共有する評価表・方向テーブルなどのキャッシュ
+- terminal_cache_bytes: 終局局面のキャッシュ（SearchEngine 1つあたりと、minimax が共有するもの）
+
+置換表と探索木の上限は、エンジンごとに渡した設定（省略時は既定の設定）で決まる。
+共有キャッシュの上限は既定の設定（set_default_config() で変更）で決まる。
+
+使い方:
+    config = EngineConfig(tt_bytes=16 * MB, mcts_bytes=8 * MB)
+    myai_selective(board, color, config=config)
+    memory_report()  # {構造の名前: {"bytes": 実測値, "budget": 上限}}
+"""
+
+import math
+import sys
+from itertools import islice
+
+MB = 1024 * 1024
+
+DEFAULT_TT_BYTES = 64 * MB
+DEFAULT_MCTS_BYTES = 64 * MB
+DEFAULT_TABLE_CACHE_BYTES = 4 * MB
+DEFAULT_TERMINAL_CACHE_BYTES = 1 * MB
+
+# 共有キャッシュ（モジュール名, 変数名, レポートでの名前）
+TABLE_CACHES = (
+    ("movegen", "_rays_cache", "movegen.rays"),
+    ("myai", "_generated_eval_tables", "myai.generated_eval_tables"),
+    ("myai", "_flat_eval_tables", "myai.flat_eval_tables"),
+    ("myai", "_blended_eval_tables", "myai.blended_eval_tables"),
+    ("search", "_move_orders", "search.move_orders"),
+    ("mcts", "_playout_weights", "mcts.playout_weights"),
+)
+
+# 共有されていて数えない値（小さい整数は CPython がキャッシュしている）
+_SHARED_INTS = range(-5, 257)
+
+# 辞書が1エントリあたりに使う領域（ハッシュ・キー・値の参照と索引、
+# 辞書の拡張直後の空き領域を含めた最大値）
+DICT_ENTRY_BYTES = 60
+
+# 置換表・終局局面のキャッシュが上限に達したときに捨てるエントリの割合
+EVICT_FRACTION = 0.25
+
+
+class EngineConfig:
+    """
+    キャッシュ・テーブルごとのメモリ上限（バイト）
+
+    Noneを指定した上限は無制限になる。
+    """
+
+    def __init__(self, tt_bytes=DEFAULT_TT_BYTES, mcts_bytes=DEFAULT_MCTS_BYTES,
+                 table_cache_bytes=DEFAULT_TABLE_CACHE_BYTES,
+                 terminal_cache_bytes=DEFAULT_TERMINAL_CACHE_BYTES):
+        """
+        Args:
+            tt_bytes: 置換表の上限（SearchEngine 1つあたり）
+            mcts_bytes: 探索木の上限（MCTS 1つあたり）
+            table_cache_bytes: 共有キャッシュの上限（プロセス全体）
+            terminal_cache_bytes: 終局局面のキャッシュの上限（SearchEngine 1つあたり、minimax 用）
+        """
+        self.tt_bytes = tt_bytes
+        self.mcts_bytes = mcts_bytes
+        self.table_cache_bytes = table_cache_bytes
+        self.terminal_cache_bytes = terminal_cache_bytes
+
+    def __repr__(self):
+        return (f"EngineConfig(tt_bytes={self.tt_bytes}, mcts_bytes={self.mcts_bytes}, "
+                f"table_cache_bytes={self.table_cache_bytes}, "
+                f"terminal_cache_bytes={self.terminal_cache_bytes})")
+
+
+_default_config = EngineConfig()
+
+
+def get_default_config():
+    """設定を省略したときに使う既定の設定を取得"""
+    return _default_config
+
+
+def set_default_config(config):
+    """
+    既定の設定を変更し、共有キャッシュを新しい上限に収める
+
+    Args:
+        config: EngineConfig（Noneなら初期値に戻す）
+    """
+    global _default_config
+    _default_config = config if config is not None else EngineConfig()
+    trim_table_caches()
+
+
+def deep_sizeof(obj):
+    """
+    オブジェクトとそこから参照されるオブジェクトの合計サイズ（バイト）
+
+    同じオブジェクトは1回だけ数え、小さい整数・None・真偽値は数えない。
+    リスト・タプル・集合・辞書の中身をたどる（array と bytes は getsizeof が中身を含む）。
+
+    Args:
+        obj: 計測するオブジェクト
+
+    Returns:
+        int: バイト数
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if item is None or item is True or item is False:
+            continue
+        if type(item) is int and item in _SHARED_INTS:
+            continue
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return total
+
+
+def dict_entry_bytes(*objects):
+    """
+    辞書1エントリあたりのメモリ使用量の見積もり（バイト）
+
+    Args:
+        *objects: エントリが持つオブジェクト（キー、値とその要素など）
+
+    Returns:
+        int: オブジェクトの大きさと辞書の領域の合計
+    """
+    return sum(sys.getsizeof(obj) for obj in objects) + DICT_ENTRY_BYTES
+
+
+def entry_limit(budget, entry_bytes):
+    """
+    メモリ上限に収まるエントリ数
+
+    Args:
+        budget: 上限（バイト、Noneなら無制限）
+        entry_bytes: 1エントリあたりのバイト数（dict_entry_bytes() の結果）
+
+    Returns:
+        エントリ数（上限なしなら math.inf）
+    """
+    if budget is None:
+        return math.inf
+    return max(1, budget // entry_bytes)
+
+
+def store_entry(cache, key, value, limit, priority=None):
+    """
+    上限つきの辞書に記録する
+
+    記録し直したエントリは末尾に移すため、辞書の順は最後に記録した時刻の順になる。
+    上限に達していれば、先に EVICT_FRACTION の割合のエントリを evict_entries() で捨てる。
+
+    Args:
+        cache: 記録する辞書
+        key: キー
+        value: 値
+        limit: エントリ数の上限（entry_limit() の結果）
+        priority: evict_entries() に渡す、値 → 残す優先度の関数
+    """
+    if key in cache:
+        del cache[key]
+    elif len(cache) >= limit:
+        evict_entries(cache, max(1, int(limit * EVICT_FRACTION)), priority)
+    cache[key] = value
+
+
+def evict_entries(cache, count, priority=None):
+    """
+    辞書のエントリを count 個捨てる
+
+    最後に記録した時刻の古いエントリから捨てる。priority を指定すると、
+    古いエントリ 2 * count 個のうち priority(値) の小さいものから捨てる。
+
+    Args:
+        cache: 辞書
+        count: 捨てるエントリ数
+        priority: 値 → 残す優先度の関数（Noneなら古い順）
+    """
+    if priority is None:
+        victims = list(islice(cache, count))
+    else:
+        candidates = sorted(islice(cache.items(), 2 * count), key=lambda item: priority(item[1]))
+        victims = [key for key, _ in candidates[:count]]
+    for key in victims:
+        del cache[key]
+
+
+def _loaded_module(name):
+    """読み込み済みのモジュールを取得（読み込まれていなければ None）"""
+    package = __package__ or ""
+    for module_name in (f"{package}.{name}" if package else name, name):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            return module
+    return None
+
+
+def _table_caches():
+    """読み込み済みのモジュールの共有キャッシュを列挙 [(名前, 辞書)]"""
+    caches = []
+    for module_name, attr, name in TABLE_CACHES:
+        module = _loaded_module(module_name)
+        if module is not None:
+            caches.append((name, getattr(module, attr)))
+    return caches
+
+
+# 共有キャッシュの要素ごとのサイズ {(キャッシュ名, キー): バイト数}
+# 要素は作成後に変更されないため、1回だけ計測する
+_entry_sizes = {}
+
+
+def _entry_size(name, cache, key):
+    size = _entry_sizes.get((name, key))
+    if size is None:
+        size = deep_sizeof(key) + deep_sizeof(cache[key])
+        _entry_sizes[(name, key)] = size
+    return size
+
+
+def trim_table_caches(max_bytes=None):
+    """
+    共有キャッシュの合計サイズを上限に収める（大きいキャッシュの古い要素から捨てる）
+
+    捨てた要素は次に使われたときに作り直される。
+
+    Args:
+        max_bytes: 上限（Noneなら既定の設定の table_cache_bytes）
+
+    Returns:
+        int: 捨てた後の合計サイズ（要素のみ、辞書自体は含まない）
+    """
+    if max_bytes is None:
+        max_bytes = _default_config.table_cache_bytes
+    caches = _table_caches()
+    sizes = [sum(_entry_size(name, cache, key) for key in cache) for name, cache in caches]
+    total = sum(sizes)
+    if max_bytes is None or total <= max_bytes:
+        return total
+
+    # 合計サイズが最も大きいキャッシュから、最も古い要素（辞書は挿入順を保つ）を捨てる
+    queues = [list(cache) for _, cache in caches]
+    while total > max_bytes:
+        index = max((i for i in range(len(caches)) if queues[i]), key=sizes.__getitem__, default=None)
+        if index is None:
+            break
+        name, cache = caches[index]
+        key = queues[index].pop(0)
+        size = _entry_sizes.pop((name, key), 0)
+        sizes[index] -= size
+        total -= size
+        cache.pop(key, None)
+    return total
+
+
+def memory_report(**structures):
+    """
+    構造ごとの実際のメモリ使用量を計測
+
+    共有キャッシュ、minimax の終局局面のキャッシュと、読み込み済みなら myai_ponder・myai_mcts の既定の
+    置換表・探索木を計測する。キーワード引数で渡したエンジン
+    （SearchEngine・MCTS・Ponderer など memory_usage() を持つもの）も計測する。
+
+    Args:
+        **structures: {名前: memory_usage() を持つオブジェクト}
+
+    Returns:
+        dict: {構造の名前: {"bytes": 実測値, "budget": 上限（Noneなら無制限）}}
+    """
+    report = {}
+    for name, cache in _table_caches():
+        report[name] = {"bytes": deep_sizeof(cache), "budget": None}
+    cache_total = sum(entry["bytes"] for entry in report.values())
+    report["table_caches"] = {"bytes": cache_total, "budget": _default_config.table_cache_bytes}
+
+    myai = _loaded_module("myai")
+    if myai is not None:
+        report["myai.terminal_cache"] = {"bytes": deep_sizeof(myai._terminal_cache),
+                                         "budget": _default_config.terminal_cache_bytes}
+
+    ponder = _loaded_module("ponder")
+    if ponder is not None and ponder._default_ponderer is not None:
+        structures.setdefault("myai_ponder", ponder._default_ponderer)
+    mcts = _loaded_module("mcts")
+    if mcts is not None and mcts._default_tree is not None:
+        structures.setdefault("myai_mcts", mcts._default_tree)
+
+    for prefix, structure in structures.items():
+        for name, usage in structure.memory_usage().items():
+            report[f"{prefix}.{name}"] = usage
+    return report
+
+
+def format_report(report):
+    """memory_report() の結果を表形式の文字列にする"""
+    lines = []
+    for name, usage in report.items():
+        budget = usage["budget"]
+        budget_text = f"{budget / MB:10.2f} MB" if budget is not None else "         -"
+        lines.append(f"{name:32s} {usage['bytes'] / MB:10.3f} MB  (上限 {budget_text})")
+    return "\n".join(lines)
@@ -0,0 +1,237 @@
+"""
+棋譜（ゲームレコード）の保存と読み込み
+
+棋譜ファイルは追記専用のバイナリ形式で、1手を1バイトで記録する。
+
+ファイル形式:
+    ファイルヘッダ（8バイト）: b"OTGR" + バージョン(1バイト) + 予約(3バイト)
+    棋譜を必要なだけ連続して並べる。各棋譜は
+        棋譜ヘッダ（6バイト、リトルエンディアン）:
+            ボードサイズ(1バイト) + フラグ(1バイト) + 手数(2バイト)
+            + 最終石数差 黒-白(符号付き2バイト)
+        手（手数バイト）: y * サイズ + x、パスは 0xFF
+
+読み込みはジェネレータで1件ずつ行うため、巨大なファイルでもメモリを消費しない。
+"""
+
+import os
+import struct
+from collections import namedtuple
+
+try:
+    from .movegen import can_place, get_rays, play, unflatten
+except ImportError:
+    from movegen import can_place, get_rays, play, unflatten
+
+
+MAGIC = b"OTGR"
+VERSION = 1
+FILE_HEADER = MAGIC + bytes((VERSION, 0, 0, 0))
+RECORD_HEADER = struct.Struct("<BBHh")
+
+PASS = 0xFF
+MAX_BOARD_SIZE = 15  # 15 * 15 = 225 < PASS
+
+# フラグ
+FLAG_FINISHED = 0x01  # 終局まで記録されている
+
+# 棋譜1件
+# size: ボードサイズ、moves: 手のバイト列、result: 最終石数差（黒 - 白）、
+# finished: 終局まで記録されているか
+GameRecord = namedtuple("GameRecord", ["size", "moves", "result", "finished"])
+
+
+def encode_move(move, size):
+    """
+    手を1バイトの値に変換
+
+    Args:
+        move: (x, y) または None（パス）
+        size: ボードサイズ
+
+    Returns:
+        int: 0〜254、パスは PASS
+    """
+    if move is None:
+        return PASS
+    x, y = move
+    return y * size + x
+
+
+def decode_move(value, size):
+    """
+    1バイトの値を手に変換
+
+    Args:
+        value: encode_move() の結果
+        size: ボードサイズ
+
+    Returns:
+        (x, y) または None（パス）
+    """
+    if value == PASS:
+        return None
+    return value % size, value // size
+
+
+def encode_record(record):
+    """
+    棋譜1件をバイト列に変換
+
+    Args:
+        record: GameRecord
+
+    Returns:
+        bytes: 棋譜ヘッダ + 手
+    """
+    if not 4 <= record.size <= MAX_BOARD_SIZE:
+        raise ValueError(f"unsupported board size: {record.size}")
+    flags = FLAG_FINISHED if record.finished else 0
+    return RECORD_HEADER.pack(record.size, flags, len(record.moves), record.result) + bytes(record.moves)
+
+
+def append_records(path, records):
+    """
+    棋譜をファイルに追記する（ファイルがなければヘッダ付きで作成）
+
+    Args:
+        path: 棋譜ファイルのパス
+        records: GameRecord の反復可能オブジェクト
+
+    Returns:
+        int: 追記した件数
+    """
+    count = 0
+    with open(path, "ab") as f:
+        if f.tell() == 0:
+            f.write(FILE_HEADER)
+        for record in records:
+            f.write(encode_record(record))
+            count += 1
+    return count
+
+
+def read_records(path):
+    """
+    棋譜ファイルを先頭から1件ずつ読み込む
+
+    Args:
+        path: 棋譜ファイルのパス
+
+    Yields:
+        GameRecord
+    """
+    with open(path, "rb") as f:
+        header = f.read(len(FILE_HEADER))
+        if header[:4] != MAGIC:
+            raise ValueError(f"not a game record file: {path}")
+        if header[4] != VERSION:
+            raise ValueError(f"unsupported game record version: {header[4]}")
+
+        while True:
+            record_header = f.read(RECORD_HEADER.size)
+            if not record_header:
+                break
+            if len(record_header) < RECORD_HEADER.size:
+                raise ValueError(f"truncated game record in {path}")
+            size, flags, num_moves, result = RECORD_HEADER.unpack(record_header)
+            moves = f.read(num_moves)
+            if len(moves) < num_moves:
+                raise ValueError(f"truncated game record in {path}")
+            yield GameRecord(size, moves, result, bool(flags & FLAG_FINISHED))
+
+
+def replay(record):
+    """
+    棋譜を初期局面から再生する
+
+    Args:
+        record: GameRecord
+
+    Yields:
+        (ボード, 手番の色, 手): 各手を打つ前の局面（新しいボード）と、
+        その局面で打たれた手 (x, y)（パスは None）
+    """
+    size = record.size
+    rays = get_rays(size, size)
+    cells = [0] * (size * size)
+    center = size // 2
+    cells[(center - 1) * size + center - 1] = 2
+    cells[(center - 1) * size + center] = 1
+    cells[center * size + center - 1] = 1
+    cells[center * size + center] = 2
+
+    color = 1
+    for value in record.moves:
+        yield unflatten(cells, size), color, decode_move(value, size)
+        if value != PASS:
+            if value >= len(cells) or not can_place(cells, color, value, rays):
+                raise ValueError(f"illegal move in game record: {decode_move(value, size)}")
+            play(cells, color, value, rays)
+        color = 3 - color
+
+
+class GameRecorder:
+    """
+    対局中の手を記録し、終局時に棋譜ファイルへ追記する
+
+    使い方:
+        recorder = GameRecorder(6)
+        recorder.add(x, y)      # 手
+        recorder.add_pass()     # パス
+        recorder.save("games.ogr", board)
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.moves = bytearray()
+
+    def add(self, x, y):
+        """手を記録"""
+        self.moves.append(encode_move((x, y), self.size))
+
+    def add_pass(self):
+        """パスを記録"""
+        self.moves.append(PASS)
+
+    def to_record(self, board, finished=True):
+        """
+        記録した手を GameRecord にする
+
+        Args:
+            board: 最終局面のボード（石数差の計算に使う）
+            finished: 終局まで記録したか
+
+        Returns:
+            GameRecord
+        """
+        black = sum(row.count(1) for row in board)
+        white = sum(row.count(2) for row in board)
+        return GameRecord(self.size, bytes(self.moves), black - white, finished)
+
+    def save(self, path, board, finished=True):
+        """棋譜ファイルに追記"""
+        append_records(path, [self.to_record(board, finished)])
+
+
+def count_records(path):
+    """
+    棋譜ファイル内の件数を数える（手は読み飛ばす）
+
+    Args:
+        path: 棋譜ファイルのパス
+
+    Returns:
+        int: 件数
+    """
+    count = 0
+    with open(path, "rb") as f:
+        f.seek(len(FILE_HEADER))
+        while True:
+            record_header = f.read(RECORD_HEADER.size)
+            if len(record_header) < RECORD_HEADER.size:
+                break
+            num_moves = RECORD_HEADER.unpack(record_header)[2]
+            f.seek(num_moves, os.SEEK_CUR)
+            count += 1
+    return count
@@ -0,0 +1,140 @@
+"""
+対局エンジンサーバーの負荷試験
+
+多数の対局を同時に進め、各手番で全対局のリクエストを1つのバッチとして
+サーバーに送る。終局までの処理件数、スループット、レイテンシを表示する。
+
+使い方:
+    python loadtest.py --games 32 --workers 4 --time-budget 0.05
+"""
+
+import argparse
+import time
+
+try:
+    from .engine_client import EngineClient
+    from .movegen import legal_moves, place
+    from .othello_utils import count_stones, create_initial_board
+except ImportError:
+    from engine_client import EngineClient
+    from movegen import legal_moves, place
+    from othello_utils import count_stones, create_initial_board
+
+
+def percentile(values, p):
+    """
+    パーセンタイル値を計算（最近傍法）
+
+    Args:
+        values: 数値のリスト
+        p: パーセント（0〜100）
+
+    Returns:
+        パーセンタイル値（空なら0）
+    """
+    if not values:
+        return 0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_load_test(client, games=16, board_size=6, time_budget=0.05,
+                  black_player="search", white_player="search"):
+    """
+    複数の対局を終局まで同時に進める
+
+    Args:
+        client: EngineClient
+        games: 同時対局数
+        board_size: ボードサイズ
+        time_budget: "search" の1手あたりの制限時間（秒）
+        black_player: 黒のプレイヤー名
+        white_player: 白のプレイヤー名
+
+    Returns:
+        dict: 集計結果
+    """
+    boards = {f"game-{i}": create_initial_board(board_size) for i in range(games)}
+    colors = {game: 1 for game in boards}
+    active = set(boards)
+    latencies = []
+    compute_times = []
+    errors = 0
+    batches = 0
+
+    start = time.perf_counter()
+    while active:
+        requests = []
+        for game in sorted(active):
+            board, color = boards[game], colors[game]
+            if not legal_moves(board, color):
+                if not legal_moves(board, 3 - color):
+                    active.discard(game)
+                    continue
+                colors[game] = color = 3 - color  # パス
+            requests.append({
+                "game": game, "board": board, "color": color,
+                "player": black_player if color == 1 else white_player,
+                "time_budget": time_budget,
+            })
+        if not requests:
+            break
+
+        batches += 1
+        for request, response in zip(requests, client.request_batch(requests)):
+            game = request["game"]
+            latencies.append(response.get("latency_ms", 0))
+            compute_times.append(response.get("compute_ms", 0))
+            if "error" in response or not response.get("move"):
+                errors += 1
+                active.discard(game)
+                continue
+            x, y = response["move"]
+            place(boards[game], request["color"], x, y)
+            colors[game] = 3 - request["color"]
+    elapsed = time.perf_counter() - start
+
+    for game in boards:
+        client.end_game(game)
+
+    results = [count_stones(board) for board in boards.values()]
+    return {
+        "games": games,
+        "requests": len(latencies),
+        "batches": batches,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0,
+        "latency_ms_p50": percentile(latencies, 50),
+        "latency_ms_p95": percentile(latencies, 95),
+        "latency_ms_max": max(latencies, default=0),
+        "compute_ms_mean": round(sum(compute_times) / len(compute_times), 3) if compute_times else 0,
+        "black_wins": sum(1 for black, white in results if black > white),
+        "white_wins": sum(1 for black, white in results if white > black),
+    }
+
+
+def main(argv=None):
+    """コマンドラインのエントリポイント"""
+    parser = argparse.ArgumentParser(description="対局エンジンサーバーの負荷試験")
+    parser.add_argument("--games", type=int, default=16, help="同時対局数")
+    parser.add_argument("--workers", type=int, default=None, help="サーバーのワーカープロセス数")
+    parser.add_argument("--size", type=int, default=6, help="ボードサイズ")
+    parser.add_argument("--time-budget", type=float, default=0.05, help="1手あたりの制限時間（秒）")
+    parser.add_argument("--black", default="search", help="黒のプレイヤー名")
+    parser.add_argument("--white", default="search", help="白のプレイヤー名")
+    args = parser.parse_args(argv)
+
+    with EngineClient(workers=args.workers) as client:
+        summary = run_load_test(client, games=args.games, board_size=args.size,
+                                time_budget=args.time_budget,
+                                black_player=args.black, white_player=args.white)
+
+    print("=== 負荷試験結果 ===")
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
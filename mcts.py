@@ -0,0 +1,469 @@
+"""
+モンテカルロ木探索（MCTS）
+
+UCT / PUCT による木探索で手を選ぶ。ミニマックス系とは別系統のAIとして、
+同じ思考時間での対戦比較に使う。
+
+- ノードは辞書ではなく、種類ごとの配列（array）に格納する。
+  子ノードは連続した番号で確保し、(最初の子, 子の数) で参照する。
+- プレイアウトは movegen の1次元配列版の着手生成で行い、
+  評価表（EVAL_TABLES）の値で手を重み付けして選ぶこともできる。
+- 連続する手番の間で探索木を再利用する（自分の手と相手の手をたどって根を付け替える）。
+- 予算は反復回数（visits）と制限時間（time_budget）のどちらか早い方。
+- workers > 1 のとき、プロセスごとに独立した木を育てて根の訪問回数を合算する（ルート並列化）。
+- 木のノード数は config.mcts_bytes に収まる数までとし、上限に達したら
+  それ以上展開せずにプレイアウトだけを続ける。
+"""
+
+import math
+import multiprocessing
+import random
+import sys
+import time
+from array import array
+
+try:
+    from .engine_config import get_default_config, trim_table_caches
+    from .myai import get_flat_eval_table
+    from .movegen import flatten, get_rays, play, valid_moves
+except ImportError:
+    from engine_config import get_default_config, trim_table_caches
+    from myai import get_flat_eval_table
+    from movegen import flatten, get_rays, play, valid_moves
+
+
+PASS = -1          # パスを表す手
+UNEXPANDED = -1    # first_child の値: まだ展開していない
+TERMINAL = -2      # first_child の値: 終局ノード
+
+DEFAULT_TIME_BUDGET = 1.0
+
+# ノード1つあたりのバイト数（各配列の要素サイズの合計）
+NODE_BYTES = sum(array(typecode).itemsize for typecode in "ihbihidd")
+
+# サイズごとのプレイアウト用の重み {(rows, cols): 重み}
+_playout_weights = {}
+
+
+def get_playout_weights(rows, cols):
+    """
+    プレイアウトで手を選ぶときの重みを取得（サイズごとにキャッシュ）
+
+    序盤の評価表の値を、最も低いマスが1になるように平行移動した値。
+    隅は重く、X打ち・C打ちは軽くなる。
+
+    Args:
+        rows: 行数
+        cols: 列数
+
+    Returns:
+        list: マス番号ごとの重み
+    """
+    key = (rows, cols)
+    weights = _playout_weights.get(key)
+    if weights is None:
+        table = get_flat_eval_table(rows, cols, "beginning")
+        lowest = min(table)
+        weights = [value - lowest + 1 for value in table]
+        _playout_weights[key] = weights
+    return weights
+
+
+class MCTS:
+    """
+    配列でノードを管理するモンテカルロ木探索
+
+    各ノードの統計（wins / visits）は、そのノードへ着手した側（mover）から見た値。
+    """
+
+    def __init__(self, exploration=1.4, use_prior=True, biased_playout=True, seed=None, config=None):
+        """
+        Args:
+            exploration: 探索項の係数
+            use_prior: True なら評価表の重みを事前確率とする PUCT、False なら UCT
+            biased_playout: True なら評価表で重み付けしたプレイアウト、False なら一様ランダム
+            seed: 乱数のシード
+            config: メモリ設定 EngineConfig（Noneなら既定の設定）
+        """
+        self.config = config
+        self.exploration = exploration
+        self.use_prior = use_prior
+        self.biased_playout = biased_playout
+        self.rng = random.Random(seed)
+        self.root_cells = None
+        self.root_color = None
+        self.rows = self.cols = 0
+        self._clear_tree()
+
+    def _clear_tree(self):
+        self.parent = array('i')
+        self.move = array('h')
+        self.mover = array('b')
+        self.first_child = array('i')
+        self.num_children = array('h')
+        self.visits = array('i')
+        self.wins = array('d')
+        self.prior = array('d')
+
+    def node_count(self):
+        """木のノード数"""
+        return len(self.visits)
+
+    def max_nodes(self):
+        """
+        メモリ設定から決まるノード数の上限
+
+        配列は拡張時に約1/16の余裕を確保するため、その分を差し引く。
+        """
+        budget = (self.config or get_default_config()).mcts_bytes
+        if budget is None:
+            return math.inf
+        return max(1, budget * 16 // (NODE_BYTES * 17))
+
+    def _arrays(self):
+        return (self.parent, self.move, self.mover, self.first_child,
+                self.num_children, self.visits, self.wins, self.prior)
+
+    def memory_usage(self):
+        """
+        探索木の実際のメモリ使用量
+
+        Returns:
+            dict: {"tree": {"bytes": 実測値, "budget": 上限}}
+        """
+        budget = (self.config or get_default_config()).mcts_bytes
+        return {"tree": {"bytes": sum(sys.getsizeof(a) for a in self._arrays()), "budget": budget}}
+
+    def _add_node(self, parent, move, mover, prior):
+        self.parent.append(parent)
+        self.move.append(move)
+        self.mover.append(mover)
+        self.first_child.append(UNEXPANDED)
+        self.num_children.append(0)
+        self.visits.append(0)
+        self.wins.append(0.0)
+        self.prior.append(prior)
+        return len(self.visits) - 1
+
+    def set_root(self, board, color):
+        """
+        探索する局面を設定する（前回の木に含まれる局面なら木を再利用）
+
+        Args:
+            board: 2次元配列のオセロボード
+            color: 手番の色
+
+        Returns:
+            bool: 木を再利用できたか
+        """
+        rows, cols = len(board), len(board[0])
+        cells = flatten(board)
+        if self.root_cells is not None and (rows, cols) == (self.rows, self.cols):
+            node = self._find_descendant(cells, color)
+            if node is not None:
+                self._reroot(node)
+                self.root_cells = cells
+                self.root_color = color
+                return True
+
+        self.rows, self.cols = rows, cols
+        self.root_cells = cells
+        self.root_color = color
+        self._clear_tree()
+        self._add_node(-1, PASS, 3 - color, 1.0)
+        return False
+
+    def _children(self, node):
+        first = self.first_child[node]
+        if first < 0:
+            return range(0)
+        return range(first, first + self.num_children[node])
+
+    def _find_descendant(self, cells, color):
+        """根から2手以内（自分の手と相手の手）でたどれる局面のノードを探す"""
+        rays = get_rays(self.rows, self.cols)
+        frontier = [(0, self.root_cells)]
+        for _ in range(2):
+            next_frontier = []
+            for node, node_cells in frontier:
+                for child in self._children(node):
+                    child_cells = node_cells[:]
+                    if self.move[child] != PASS:
+                        play(child_cells, self.mover[child], self.move[child], rays)
+                    if child_cells == cells and 3 - self.mover[child] == color:
+                        return child
+                    next_frontier.append((child, child_cells))
+            frontier = next_frontier
+        return None
+
+    def _reroot(self, new_root):
+        """new_root 以下の部分木だけを新しい配列に詰め直す"""
+        old = self._arrays()
+        old_parent, old_move, old_mover, old_first, old_num, old_visits, old_wins, old_prior = old
+        self._clear_tree()
+
+        def copy_node(old_index, parent):
+            index = self._add_node(parent, old_move[old_index], old_mover[old_index], old_prior[old_index])
+            self.visits[index] = old_visits[old_index]
+            self.wins[index] = old_wins[old_index]
+            if old_first[old_index] == TERMINAL:
+                self.first_child[index] = TERMINAL
+            return index
+
+        copy_node(new_root, -1)
+        queue = [(new_root, 0)]
+        while queue:
+            next_queue = []
+            for old_index, index in queue:
+                first = old_first[old_index]
+                if first < 0:
+                    continue
+                self.first_child[index] = len(self.visits)
+                self.num_children[index] = old_num[old_index]
+                for old_child in range(first, first + old_num[old_index]):
+                    next_queue.append((old_child, copy_node(old_child, index)))
+            queue = next_queue
+
+    def search(self, visits=None, time_budget=None):
+        """
+        現在の根から探索を行う
+
+        Args:
+            visits: 反復回数の上限（Noneなら制限なし）
+            time_budget: 制限時間（秒、Noneなら制限なし）
+
+        Returns:
+            int: 今回行った反復回数
+        """
+        if visits is None and time_budget is None:
+            time_budget = DEFAULT_TIME_BUDGET
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        rays = get_rays(self.rows, self.cols)
+        weights = get_playout_weights(self.rows, self.cols)
+        trim_table_caches()
+        max_nodes = self.max_nodes()
+
+        iterations = 0
+        while visits is None or iterations < visits:
+            if deadline is not None and iterations & 15 == 0 and time.monotonic() >= deadline:
+                break
+            self._iterate(rays, weights, max_nodes)
+            iterations += 1
+        return iterations
+
+    def _iterate(self, rays, weights, max_nodes):
+        cells = self.root_cells[:]
+        node = 0
+        color = self.root_color
+
+        # 選択
+        while self.first_child[node] >= 0:
+            node = self._select_child(node)
+            if self.move[node] != PASS:
+                play(cells, self.mover[node], self.move[node], rays)
+            color = 3 - self.mover[node]
+
+        # 展開（一度訪問した葉、または根。子の数はマス数以下なので、
+        # それだけの空きがなければ葉のままプレイアウトする）
+        if (self.first_child[node] == UNEXPANDED and (self.visits[node] > 0 or node == 0)
+                and len(self.visits) + len(cells) <= max_nodes):
+            self._expand(node, cells, color, rays, weights)
+            if self.first_child[node] >= 0:
+                node = self._select_child(node)
+                if self.move[node] != PASS:
+                    play(cells, self.mover[node], self.move[node], rays)
+                color = 3 - self.mover[node]
+
+        # プレイアウト
+        winner = self._playout(cells, color, rays, weights)
+
+        # 逆伝播
+        while node != -1:
+            self.visits[node] += 1
+            if winner == self.mover[node]:
+                self.wins[node] += 1.0
+            elif winner == 0:
+                self.wins[node] += 0.5
+            node = self.parent[node]
+
+    def _expand(self, node, cells, color, rays, weights):
+        moves = valid_moves(cells, color, rays)
+        if not moves:
+            if valid_moves(cells, 3 - color, rays):
+                moves = [PASS]
+            else:
+                self.first_child[node] = TERMINAL
+                return
+        total = sum(weights[move] for move in moves) if moves[0] != PASS else 1.0
+        first = len(self.visits)
+        for move in moves:
+            prior = weights[move] / total if move != PASS else 1.0
+            self._add_node(node, move, color, prior)
+        self.first_child[node] = first
+        self.num_children[node] = len(moves)
+
+    def _select_child(self, node):
+        visits = self.visits
+        wins = self.wins
+        first = self.first_child[node]
+        children = range(first, first + self.num_children[node])
+        parent_visits = visits[node]
+        best_child = first
+        best_value = -math.inf
+
+        if self.use_prior:
+            # PUCT: Q + c * P * sqrt(N) / (1 + n)
+            sqrt_total = math.sqrt(parent_visits + 1)
+            prior = self.prior
+            c = self.exploration
+            for child in children:
+                n = visits[child]
+                q = wins[child] / n if n else 0.5
+                value = q + c * prior[child] * sqrt_total / (1 + n)
+                if value > best_value:
+                    best_value = value
+                    best_child = child
+        else:
+            # UCT: 未訪問の子を優先し、その後は Q + c * sqrt(ln N / n)
+            log_total = math.log(parent_visits + 1)
+            c = self.exploration
+            for child in children:
+                n = visits[child]
+                if n == 0:
+                    return child
+                value = wins[child] / n + c * math.sqrt(log_total / n)
+                if value > best_value:
+                    best_value = value
+                    best_child = child
+        return best_child
+
+    def _playout(self, cells, color, rays, weights):
+        """終局までランダムに打ち、勝者の色（引き分けは0）を返す（cells は破壊される）"""
+        rng = self.rng
+        passed = False
+        while True:
+            moves = valid_moves(cells, color, rays)
+            if moves:
+                if self.biased_playout and len(moves) > 1:
+                    move = rng.choices(moves, [weights[m] for m in moves])[0]
+                else:
+                    move = moves[rng.randrange(len(moves))]
+                play(cells, color, move, rays)
+                passed = False
+            elif passed:
+                break
+            else:
+                passed = True
+            color = 3 - color
+
+        black = cells.count(1)
+        white = cells.count(2)
+        if black > white:
+            return 1
+        if white > black:
+            return 2
+        return 0
+
+    def root_visits(self):
+        """
+        根の子ごとの訪問回数
+
+        Returns:
+            dict: {マス番号（パスは PASS）: 訪問回数}
+        """
+        return {self.move[child]: self.visits[child] for child in self._children(0)}
+
+    def best_move(self):
+        """
+        最も訪問回数の多い手
+
+        Returns:
+            (x, y) または None（パスまたは終局）
+        """
+        counts = self.root_visits()
+        if not counts:
+            return None
+        square = max(counts, key=counts.get)
+        if square == PASS:
+            return None
+        return square % self.cols, square // self.cols
+
+
+def _root_parallel_worker(args):
+    board, color, visits, time_budget, seed, options = args
+    tree = MCTS(seed=seed, **options)
+    tree.set_root(board, color)
+    tree.search(visits, time_budget)
+    return tree.root_visits()
+
+
+def root_parallel_search(board, color, workers, visits=None, time_budget=None, seed=None, **options):
+    """
+    プロセスごとに独立した木で探索し、根の訪問回数を合算する（ルート並列化）
+
+    Args:
+        board: 2次元配列のオセロボード
+        color: 手番の色
+        workers: プロセス数
+        visits: 全体の反復回数の上限（プロセス数で等分する）
+        time_budget: 制限時間（秒、各プロセス共通）
+        seed: 乱数のシード（プロセスごとに seed + 番号 を使う）
+        **options: MCTS のオプション
+
+    Returns:
+        dict: {マス番号（パスは PASS）: 合計訪問回数}
+    """
+    per_worker = -(-visits // workers) if visits is not None else None
+    if per_worker is None and time_budget is None:
+        time_budget = DEFAULT_TIME_BUDGET
+    base = seed if seed is not None else random.randrange(1 << 30)
+    tasks = [(board, color, per_worker, time_budget, base + i, options) for i in range(workers)]
+    totals = {}
+    with multiprocessing.Pool(workers) as pool:
+        for counts in pool.map(_root_parallel_worker, tasks):
+            for move, count in counts.items():
+                totals[move] = totals.get(move, 0) + count
+    return totals
+
+
+_default_tree = None
+
+
+def myai_mcts(board, color, visits=None, time_budget=DEFAULT_TIME_BUDGET, workers=1, config=None):
+    """
+    モンテカルロ木探索AI: プレイアウトの勝率で手を選ぶ
+
+    連続して呼び出すと、前回の探索木のうち実際に進んだ局面以下を再利用する。
+
+    Args:
+        board: 2次元配列のオセロボード
+        color: 自分の色 (BLACK=1, WHITE=2)
+        visits: 反復回数の上限（Noneなら制限なし）
+        time_budget: 制限時間（秒、Noneなら制限なし）
+        workers: プロセス数（2以上でルート並列化、この場合は木を再利用しない）
+        config: この呼び出しのメモリ設定 EngineConfig（Noneなら既定の設定、
+                ルート並列化では各プロセスの木に適用）
+
+    Returns:
+        (column, row): 最適手
+    """
+    global _default_tree
+    if workers > 1:
+        counts = root_parallel_search(board, color, workers, visits, time_budget, config=config)
+        counts.pop(PASS, None)
+        if not counts:
+            return (0, 0)
+        square = max(counts, key=counts.get)
+        cols = len(board[0])
+        return square % cols, square // cols
+
+    if _default_tree is None:
+        _default_tree = MCTS()
+    # 設定はこの呼び出しにだけ適用する（前回の木が新しい上限に収まらなければ作り直す）
+    _default_tree.config = config
+    if _default_tree.node_count() > _default_tree.max_nodes():
+        _default_tree = MCTS(config=config)
+    _default_tree.set_root(board, color)
+    _default_tree.search(visits, time_budget)
+    move = _default_tree.best_move()
+    return move if move else (0, 0)
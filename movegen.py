@@ -0,0 +1,225 @@
+"""
+高速な着手生成
+
+盤面を1次元配列（y * cols + x）として扱い、各マスから8方向へ伸びる
+「走査線」をボードサイズごとに一度だけ前計算してキャッシュする。
+境界チェックが不要になるため、6x6・8x8だけでなく10x10・12x12などの
+大きな盤面でも同じコードで高速に動作する。
+"""
+
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# ボードサイズ (rows, cols) ごとの走査線キャッシュ
+_rays_cache = {}
+
+
+def get_rays(rows, cols):
+    """
+    各マスから8方向へ伸びる走査線を取得（サイズごとにキャッシュ）
+
+    長さ1以下の走査線では石を挟めないため含めない。
+
+    Args:
+        rows: 行数
+        cols: 列数
+
+    Returns:
+        list: マス番号ごとの走査線のタプル（各走査線はマス番号のタプル）
+    """
+    key = (rows, cols)
+    rays = _rays_cache.get(key)
+    if rays is None:
+        rays = []
+        for y in range(rows):
+            for x in range(cols):
+                square_rays = []
+                for dx, dy in DIRECTIONS:
+                    ray = []
+                    nx, ny = x + dx, y + dy
+                    while 0 <= nx < cols and 0 <= ny < rows:
+                        ray.append(ny * cols + nx)
+                        nx += dx
+                        ny += dy
+                    if len(ray) >= 2:
+                        square_rays.append(tuple(ray))
+                rays.append(tuple(square_rays))
+        _rays_cache[key] = rays
+    return rays
+
+
+def flatten(board):
+    """
+    2次元配列のボードを1次元配列に変換
+
+    Args:
+        board: 2次元配列のオセロボード
+
+    Returns:
+        list: 1次元配列の盤面
+    """
+    return [cell for row in board for cell in row]
+
+
+def unflatten(cells, cols):
+    """
+    1次元配列の盤面を2次元配列に戻す
+
+    Args:
+        cells: 1次元配列の盤面
+        cols: 列数
+
+    Returns:
+        2次元配列のオセロボード
+    """
+    return [cells[i:i + cols] for i in range(0, len(cells), cols)]
+
+
+def can_place(cells, color, square, rays):
+    """
+    指定マスに石を置けるかチェック（1次元配列版）
+
+    Args:
+        cells: 1次元配列の盤面
+        color: 石の色
+        square: マス番号
+        rays: get_rays() の結果
+
+    Returns:
+        bool: 置けるならTrue
+    """
+    if cells[square] != 0:
+        return False
+    opponent = 3 - color
+    for ray in rays[square]:
+        if cells[ray[0]] != opponent:
+            continue
+        for i in ray[1:]:
+            cell = cells[i]
+            if cell == opponent:
+                continue
+            if cell == color:
+                return True
+            break
+    return False
+
+
+def valid_moves(cells, color, rays):
+    """
+    有効な手のマス番号の一覧を取得（1次元配列版）
+
+    Args:
+        cells: 1次元配列の盤面
+        color: 手番の色
+        rays: get_rays() の結果
+
+    Returns:
+        list: マス番号のリスト（昇順 = 2次元配列での行優先順）
+    """
+    opponent = 3 - color
+    moves = []
+    for square, cell in enumerate(cells):
+        if cell != 0:
+            continue
+        for ray in rays[square]:
+            if cells[ray[0]] != opponent:
+                continue
+            found = False
+            for i in ray[1:]:
+                cell = cells[i]
+                if cell == opponent:
+                    continue
+                found = cell == color
+                break
+            if found:
+                moves.append(square)
+                break
+    return moves
+
+
+def play(cells, color, square, rays):
+    """
+    石を置いて相手の石をひっくり返す（破壊的変更、1次元配列版）
+
+    Args:
+        cells: 1次元配列の盤面
+        color: 石の色
+        square: マス番号（有効な手であること）
+        rays: get_rays() の結果
+
+    Returns:
+        list: ひっくり返したマス番号（undo() に渡す）
+    """
+    opponent = 3 - color
+    flipped = []
+    for ray in rays[square]:
+        if cells[ray[0]] != opponent:
+            continue
+        for n, i in enumerate(ray):
+            cell = cells[i]
+            if cell == opponent:
+                continue
+            if cell == color:
+                flipped.extend(ray[:n])
+            break
+    cells[square] = color
+    for i in flipped:
+        cells[i] = color
+    return flipped
+
+
+def undo(cells, color, square, flipped):
+    """
+    play() を取り消す
+
+    Args:
+        cells: 1次元配列の盤面
+        color: play() で置いた石の色
+        square: play() で置いたマス番号
+        flipped: play() の戻り値
+    """
+    cells[square] = 0
+    opponent = 3 - color
+    for i in flipped:
+        cells[i] = opponent
+
+
+def legal_moves(board, color):
+    """
+    有効な手の一覧を取得（2次元配列版）
+
+    Args:
+        board: 2次元配列のオセロボード
+        color: プレイヤーの色
+
+    Returns:
+        有効な手のリスト [(x, y), ...]
+    """
+    cols = len(board[0])
+    rays = get_rays(len(board), cols)
+    return [(square % cols, square // cols)
+            for square in valid_moves(flatten(board), color, rays)]
+
+
+def place(board, color, x, y):
+    """
+    石を置いて相手の石をひっくり返す（破壊的変更、2次元配列版）
+
+    Args:
+        board: 2次元配列のオセロボード
+        color: 石の色
+        x: 列位置
+        y: 行位置
+
+    Returns:
+        int: ひっくり返した石の数（置けない場合は0で盤面は変更しない）
+    """
+    cols = len(board[0])
+    rays = get_rays(len(board), cols)
+    cells = flatten(board)
+    if not can_place(cells, color, y * cols + x, rays):
+        return 0
+    flipped = play(cells, color, y * cols + x, rays)
+    board[y][x] = color
+    for i in flipped:
+        board[i // cols][i % cols] = color
+    return len(flipped)
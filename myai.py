@@ -17,6 +17,13 @@ except ImportError:
         # 同じディレクトリのothello_utilsがある場合
         from othello_utils import can_place_x_y, move_stone, copy
 
+try:
+    from .engine_config import dict_entry_bytes, entry_limit, get_default_config, store_entry
+    from .movegen import flatten, legal_moves, place
+except ImportError:
+    from engine_config import dict_entry_bytes, entry_limit, get_default_config, store_entry
+    from movegen import flatten, legal_moves, place
+
 
 # 評価表
 EVAL_TABLES = {
@@ -87,10 +94,86 @@ EVAL_TABLES = {
 }
 
 
+GAME_PHASES = ("beginning", "midgame", "endgame")
+
+# EVAL_TABLESにないサイズ用に生成した評価表のキャッシュ {(rows, cols, phase): 評価表}
+_generated_eval_tables = {}
+
+# 1次元配列に変換した評価表のキャッシュ {(rows, cols, phase): 評価表}
+_flat_eval_tables = {}
+
+# 局面別評価表を補間するときの基準点 (進行度, 局面)
+# 進行度（石の割合）が基準点ではその局面の評価表をそのまま使い、基準点の間は線形に補間する
+PHASE_ANCHORS = ((0.25, "beginning"), (0.5, "midgame"), (0.75, "endgame"))
+
+# 空きマス数ごとに補間した評価表のキャッシュ {(rows, cols): 評価表}
+_blended_eval_tables = {}
+
+# 終局の評価値の基準（評価関数の値の範囲より十分大きい）
+# 勝ちは WIN_SCORE + 石数差、負けは -WIN_SCORE + 石数差、引き分けは 0
+WIN_SCORE = 1000000
+
+# 終局局面のキャッシュ {盤面のバイト列: 黒から見た終局の評価値}
+# minimax が使う。探索エンジンはインスタンスごとに同じ形式のキャッシュを持つ
+_terminal_cache = {}
+
+
+def generate_eval_table(rows, cols, game_phase="beginning"):
+    """
+    任意サイズの評価表を生成（サイズごとにキャッシュ）
+
+    各マスを「最も近い辺からの距離 r」と「その辺に沿った隅からの距離 s」で分類し、
+    8x8評価表の同じ種類のマスの値を割り当てる。
+    - r=0: 隅(s=0)、C打ち(s=1)、A打ち(s=2)、B打ち(s≥3)
+    - r=1: X打ち(s=1)、X打ちの隣(s=2)、それ以外(s≥3)
+    - r=2: 内側の隅(s=2)、それ以外(s≥3)
+    - r≥3: 中央
+    8x8に対して生成するとEVAL_TABLES["8x8"]と一致する。
+
+    Args:
+        rows: 行数
+        cols: 列数
+        game_phase: 'beginning', 'midgame', 'endgame'
+
+    Returns:
+        評価表（2次元配列）
+    """
+    key = (rows, cols, game_phase)
+    table = _generated_eval_tables.get(key)
+    if table is not None:
+        return table
+
+    reference = EVAL_TABLES["8x8"][game_phase]
+    inner = (min(rows, cols) - 1) // 2
+    table = []
+    for y in range(rows):
+        row = []
+        for x in range(cols):
+            a = min(x, cols - 1 - x)
+            b = min(y, rows - 1 - y)
+            r, s = min(a, b), max(a, b)
+            if r <= 1:
+                ref_r, ref_s = r, min(s, 3)
+            elif r == 2 and s > 2:
+                ref_r, ref_s = 2, 3
+            elif r == 2 and inner > 2:
+                ref_r, ref_s = 2, 2
+            else:
+                # 中央（6x6の(2,2)のように内側の隅が中央を兼ねる場合も含む）
+                ref_r, ref_s = 3, 3
+            row.append(reference[ref_r][ref_s])
+        table.append(row)
+
+    _generated_eval_tables[key] = table
+    return table
+
+
 def get_eval_table(board, game_phase="beginning"):
     """
     ボードサイズと局面に応じた評価表を取得
 
+    EVAL_TABLESにないサイズ（10x10、12x12など）は generate_eval_table() で生成する。
+
     Args:
         board: 2次元配列のオセロボード
         game_phase: 'beginning', 'midgame', 'endgame'
@@ -98,13 +181,94 @@ def get_eval_table(board, game_phase="beginning"):
     Returns:
         評価表（2次元配列）
     """
-    size = f"{len(board)}x{len(board[0])}"
+    rows, cols = len(board), len(board[0])
+    if game_phase not in GAME_PHASES:
+        # デフォルト値
+        game_phase = "beginning"
 
-    if size in EVAL_TABLES and game_phase in EVAL_TABLES[size]:
+    size = f"{rows}x{cols}"
+    if size in EVAL_TABLES:
         return EVAL_TABLES[size][game_phase]
-    else:
-        # デフォルト値
-        return EVAL_TABLES["6x6"]["beginning"]
+    return generate_eval_table(rows, cols, game_phase)
+
+
+def get_flat_eval_table(rows, cols, game_phase="beginning"):
+    """
+    1次元配列に変換した評価表を取得（サイズごとにキャッシュ）
+
+    Args:
+        rows: 行数
+        cols: 列数
+        game_phase: 'beginning', 'midgame', 'endgame'
+
+    Returns:
+        list: 評価表（1次元配列、インデックスは y * cols + x）
+    """
+    key = (rows, cols, game_phase)
+    table = _flat_eval_tables.get(key)
+    if table is None:
+        board = [[0] * cols for _ in range(rows)]
+        table = flatten(get_eval_table(board, game_phase))
+        _flat_eval_tables[key] = table
+    return table
+
+
+def get_blended_eval_table(rows, cols):
+    """
+    空きマス数ごとに局面別評価表を補間した評価表を取得（サイズごとにキャッシュ）
+
+    序盤・中盤・終盤の評価表を PHASE_ANCHORS に従って空きマス数ごとに補間し、
+    すべての空きマス数の評価表を1つの1次元配列にまとめて返す。
+
+    Args:
+        rows: 行数
+        cols: 列数
+
+    Returns:
+        list: 長さ (n + 1) * n の評価表（n = rows * cols）。
+        空きマス数 e の評価表は [e * n:(e + 1) * n]
+    """
+    key = (rows, cols)
+    table = _blended_eval_tables.get(key)
+    if table is not None:
+        return table
+
+    n = rows * cols
+    anchors = [(progress, get_flat_eval_table(rows, cols, phase)) for progress, phase in PHASE_ANCHORS]
+    table = []
+    for empties in range(n + 1):
+        progress = 1 - empties / n
+        if progress <= anchors[0][0]:
+            table.extend(anchors[0][1])
+        elif progress >= anchors[-1][0]:
+            table.extend(anchors[-1][1])
+        else:
+            for (p0, table0), (p1, table1) in zip(anchors, anchors[1:]):
+                if p0 <= progress <= p1:
+                    t = (progress - p0) / (p1 - p0)
+                    table.extend(round(v0 + (v1 - v0) * t) for v0, v1 in zip(table0, table1))
+                    break
+
+    _blended_eval_tables[key] = table
+    return table
+
+
+def get_phase_weights(cells, rows, cols):
+    """
+    現在の空きマス数に応じた評価表の位置を取得
+
+    評価表はコピーせず、補間した評価表全体と開始位置を返す。
+
+    Args:
+        cells: 1次元配列の盤面
+        rows: 行数
+        cols: 列数
+
+    Returns:
+        (table, base): get_blended_eval_table() の結果と開始位置。
+        マス i の評価値は table[base + i]
+    """
+    return get_blended_eval_table(rows, cols), cells.count(0) * rows * cols
 
 
 def count_stable_stones(board, color):
@@ -235,30 +399,26 @@ def myai_positional(board, color):
     Returns:
         (column, row): 評価値が最も高い位置
     """
-    eval_table = get_eval_table(board)
+    cols = len(board[0])
+    eval_table = get_flat_eval_table(len(board), cols, "beginning")
 
     best_score = float('-inf')
     best_move = None
 
-    for y in range(len(board)):
-        for x in range(len(board[0])):
-            if can_place_x_y(board, color, x, y):
-                # 位置の評価値を取得
-                position_value = eval_table[y][x]
+    for x, y in get_valid_moves(board, color):
+        # 位置の評価値を取得
+        position_value = eval_table[y * cols + x]
 
-                # ひっくり返る石数も考慮
-                test_board = copy(board)
-                original_count = sum(row.count(color) for row in test_board)
-                move_stone(test_board, color, x, y)
-                new_count = sum(row.count(color) for row in test_board)
-                flip_count = new_count - original_count - 1
+        # ひっくり返る石数も考慮
+        test_board = copy(board)
+        flip_count = place(test_board, color, x, y)
 
-                # 総合スコア = 位置価値 + ひっくり返る石数
-                total_score = position_value + flip_count * 10
+        # 総合スコア = 位置価値 + ひっくり返る石数
+        total_score = position_value + flip_count * 10
 
-                if total_score > best_score:
-                    best_score = total_score
-                    best_move = (x, y)
+        if total_score > best_score:
+            best_score = total_score
+            best_move = (x, y)
 
     return best_move if best_move else (0, 0)
 
@@ -271,7 +431,7 @@ def myai_positional_improved(board, color):
     改良版位置評価AI：段階別評価表 + 確定石考慮
     サイトの知見を基に実装：
     - 負の評価値で「石を多く取らない」戦略
-    - 序盤・中盤・終盤で評価表を切り替え
+    - 序盤・中盤・終盤の評価表を空きマス数に応じて補間
     - 確定石の数も考慮
 
     Args:
@@ -281,62 +441,144 @@ def myai_positional_improved(board, color):
     Returns:
         (column, row): 評価値が最も高い位置
     """
+    rows, cols = len(board), len(board[0])
+    cells = flatten(board)
+
     # ゲーム進行度を判定
-    total_stones = sum(row.count(1) + row.count(2) for row in board)
-    total_cells = len(board) * len(board[0])
-    progress = total_stones / total_cells
+    my_stones = cells.count(color)
+    opponent_stones = cells.count(3 - color)
+    progress = (my_stones + opponent_stones) / len(cells)
 
-    # 局面に応じた評価表を取得
+    # 局面に応じた評価表を取得（evaluate_board と共通）
+    eval_table, base = get_phase_weights(cells, rows, cols)
     if progress < 0.25:
-        eval_table = get_eval_table(board, "beginning")
         flip_weight = 5   # 序盤：石を取りすぎない
     elif progress < 0.75:
-        eval_table = get_eval_table(board, "midgame")
         flip_weight = 8   # 中盤：バランス
     else:
-        eval_table = get_eval_table(board, "endgame")
         flip_weight = 15  # 終盤：石数重視
 
     best_score = float('-inf')
     best_move = None
 
-    for y in range(len(board)):
-        for x in range(len(board[0])):
-            if can_place_x_y(board, color, x, y):
-                # 手を試してみる
-                test_board = copy(board)
-                original_count = sum(row.count(color) for row in test_board)
-                move_stone(test_board, color, x, y)
-                new_count = sum(row.count(color) for row in test_board)
-                flip_count = new_count - original_count - 1
-
-                # 位置評価（負の値なので、石が少ないほど良い）
-                position_value = eval_table[y][x]
-
-                # 確定石の評価
-                my_stable = count_stable_stones(test_board, color)
-                opponent_stable = count_stable_stones(test_board, 3 - color)
-                stable_diff = my_stable - opponent_stable
-
-                # 総合評価（サイトの考え方に基づく）
-                # 1. 位置評価（負の値）
-                # 2. ひっくり返る石数（序盤は少ない方が良い）
-                # 3. 確定石の差（多い方が良い）
-                if progress < 0.5:
-                    # 序盤～中盤：石を取りすぎない戦略
-                    total_score = position_value - flip_count * flip_weight + stable_diff * 50
-                else:
-                    # 終盤：石数も重要
-                    stone_diff = sum(row.count(color) for row in test_board) - sum(row.count(3-color) for row in test_board)
-                    total_score = position_value + flip_count * flip_weight + stable_diff * 30 + stone_diff * 10
-
-                if total_score > best_score:
-                    best_score = total_score
-                    best_move = (x, y)
+    for x, y in get_valid_moves(board, color):
+        # 手を試してみる
+        test_board = copy(board)
+        flip_count = place(test_board, color, x, y)
+
+        # 位置評価（負の値なので、石が少ないほど良い）
+        position_value = eval_table[base + y * cols + x]
+
+        # 確定石の評価
+        my_stable = count_stable_stones(test_board, color)
+        opponent_stable = count_stable_stones(test_board, 3 - color)
+        stable_diff = my_stable - opponent_stable
+
+        # 総合評価（サイトの考え方に基づく）
+        # 1. 位置評価（負の値）
+        # 2. ひっくり返る石数（序盤は少ない方が良い）
+        # 3. 確定石の差（多い方が良い）
+        if progress < 0.5:
+            # 序盤～中盤：石を取りすぎない戦略
+            total_score = position_value - flip_count * flip_weight + stable_diff * 50
+        else:
+            # 終盤：石数も重要
+            stone_diff = (my_stones + flip_count + 1) - (opponent_stones - flip_count)
+            total_score = position_value + flip_count * flip_weight + stable_diff * 30 + stone_diff * 10
+
+        if total_score > best_score:
+            best_score = total_score
+            best_move = (x, y)
 
     return best_move if best_move else (0, 0)
 
 
+def terminal_score(cells, color):
+    """
+    終局局面の正確な評価値
+
+    勝ち負けは評価関数のどの値よりも大きさが大きく、同じ勝ちなら石数差の大きい方が高い。
+
+    Args:
+        cells: 1次元配列の盤面
+        color: 評価する色 (BLACK=1, WHITE=2)
+
+    Returns:
+        int: 勝ちなら WIN_SCORE + 石数差、負けなら -WIN_SCORE + 石数差、引き分けなら 0
+    """
+    return _terminal_score_from_diff(cells.count(color) - cells.count(3 - color))
+
+
+def _terminal_score_from_diff(diff):
+    if diff > 0:
+        return WIN_SCORE + diff
+    if diff < 0:
+        return -WIN_SCORE + diff
+    return 0
+
+
+def is_terminal_score(score):
+    """評価値が終局の勝ち負けを表す値か"""
+    return abs(score) >= WIN_SCORE
+
+
+def terminal_cache_limit(squares, config=None):
+    """
+    終局局面のキャッシュのエントリ数の上限
+
+    Args:
+        squares: マス数
+        config: メモリ設定 EngineConfig（Noneなら既定の設定）
+
+    Returns:
+        エントリ数（上限なしなら math.inf）
+    """
+    budget = (config or get_default_config()).terminal_cache_bytes
+    return entry_limit(budget, dict_entry_bytes(bytes(squares), WIN_SCORE))
+
+
+def cached_terminal_score(cache, cells, color):
+    """
+    キャッシュから終局局面の評価値を取得（なければ None）
+
+    Args:
+        cache: 終局局面のキャッシュ
+        cells: 1次元配列の盤面
+        color: 評価する色
+
+    Returns:
+        評価値、またはキャッシュにない場合は None
+    """
+    key = bytes(cells)
+    score = cache.pop(key, None)
+    if score is None:
+        return None
+    # 使ったエントリは末尾に移す（捨てるときは最後に使った時刻の古いものから）
+    cache[key] = score
+    return score if color == 1 else -score
+
+
+def store_terminal_score(cache, cells, color, limit):
+    """
+    終局局面の評価値を計算してキャッシュに記録
+
+    キャッシュが上限に達していれば、最後に使った時刻の古いエントリから1/4を捨てる。
+
+    Args:
+        cache: 終局局面のキャッシュ
+        cells: 1次元配列の盤面（終局していること）
+        color: 評価する色
+        limit: キャッシュのエントリ数の上限（terminal_cache_limit() の結果）
+
+    Returns:
+        int: terminal_score(cells, color)
+    """
+    # 終局の評価値は色を入れ替えると符号が反転するため、黒から見た値だけを記録する
+    black_score = terminal_score(cells, 1)
+    store_entry(cache, bytes(cells), black_score, limit)
+    return black_score if color == 1 else -black_score
+
+
 def evaluate_board(board, color):
     """
     盤面を評価する関数
@@ -348,28 +590,66 @@ def evaluate_board(board, color):
     Returns:
         評価値（数値が大きいほど有利）
     """
-    weights = get_eval_table(board)
+    rows, cols = len(board), len(board[0])
+    return evaluate_position(flatten(board), color, get_blended_eval_table(rows, cols))
+
+
+def evaluate_position(cells, color, blended_table):
+    """
+    空きマス数に応じた評価表で盤面を評価する関数（1次元配列版）
+
+    盤面が埋まった局面と一方の石がなくなった局面は終局として terminal_score() の値を返す。
+
+    evaluate_board と探索エンジン（search.py）が共通で使う。
 
+    Args:
+        cells: 1次元配列の盤面
+        color: 評価する色 (BLACK=1, WHITE=2)
+        blended_table: get_blended_eval_table() の結果
+
+    Returns:
+        評価値（数値が大きいほど有利）
+    """
+    return evaluate_cells(cells, color, blended_table, cells.count(0) * len(cells))
+
+
+def evaluate_cells(cells, color, weights, base=0):
+    """
+    盤面を評価する関数（1次元配列版）
+
+    Args:
+        cells: 1次元配列の盤面
+        color: 評価する色 (BLACK=1, WHITE=2)
+        weights: 1次元配列の評価表（get_flat_eval_table() の結果、
+                 または get_blended_eval_table() の結果）
+        base: weights の中の評価表の開始位置（マス i の評価値は weights[base + i]）
+
+    Returns:
+        評価値（数値が大きいほど有利、終局局面なら terminal_score() と同じ値）
+    """
     opponent = 3 - color
     score = 0
+    my_stones = 0
+    opponent_stones = 0
 
     # 位置評価
-    for y in range(len(board)):
-        for x in range(len(board[0])):
-            if board[y][x] == color:
-                score += weights[y][x]
-            elif board[y][x] == opponent:
-                score -= weights[y][x]
+    for i, cell in enumerate(cells, base):
+        if cell == color:
+            score += weights[i]
+            my_stones += 1
+        elif cell == opponent:
+            score -= weights[i]
+            opponent_stones += 1
 
     # 石数の差（終盤重視）
-    my_stones = sum(row.count(color) for row in board)
-    opponent_stones = sum(row.count(opponent) for row in board)
     stone_diff = my_stones - opponent_stones
 
+    # 盤面が埋まった、または一方の石がなくなった局面は終局（数えた石数で判定できる）
+    if my_stones == 0 or opponent_stones == 0 or my_stones + opponent_stones == len(cells):
+        return _terminal_score_from_diff(stone_diff)
+
     # 盤面の埋まり具合で重みを調整
-    total_stones = my_stones + opponent_stones
-    total_cells = len(board) * len(board[0])
-    game_progress = total_stones / total_cells
+    game_progress = (my_stones + opponent_stones) / len(cells)
 
     # 序盤は位置重視、終盤は石数重視
     if game_progress < 0.7:
@@ -389,45 +669,57 @@ def get_valid_moves(board, color):
     Returns:
         有効な手のリスト [(x, y), ...]
     """
-    moves = []
-    for y in range(len(board)):
-        for x in range(len(board[0])):
-            if can_place_x_y(board, color, x, y):
-                moves.append((x, y))
-    return moves
+    return legal_moves(board, color)
 
 
-def minimax(board, depth, maximizing_player, color, alpha=float('-inf'), beta=float('inf')):
+def minimax(board, depth, maximizing_player, color, alpha=float('-inf'), beta=float('inf'),
+            valid_moves=None):
     """
     アルファベータ剪定付きミニマックス法
 
+    評価値は常に color から見た値で、最大化プレイヤーが color の手番を表す。
+    終局局面は評価関数ではなく石数で評価し、勝ち負けを
+    terminal_score() の値（絶対値が WIN_SCORE 以上）で返す。
+
     Args:
         board: 現在の盤面
         depth: 探索の深さ
         maximizing_player: 最大化プレイヤーかどうか
-        color: 現在のプレイヤーの色
+        color: 評価するプレイヤー（根の手番）の色
         alpha: アルファ値（アルファベータ剪定用）
         beta: ベータ値（アルファベータ剪定用）
+        valid_moves: この局面の手番の有効手（計算済みなら渡す、Noneなら計算する）
 
     Returns:
         (評価値, 最適手)
     """
+    current_color = color if maximizing_player else 3 - color
+
     # 終了条件：深さ0または有効手なし
     if depth == 0:
-        return evaluate_board(board, color if maximizing_player else 3 - color), None
+        # 盤面が埋まった・一方の石がなくなった終局局面は evaluate_position が terminal_score の値を返す
+        cells = flatten(board)
+        return evaluate_position(cells, color, get_blended_eval_table(len(board), len(board[0]))), None
 
-    current_color = color if maximizing_player else 3 - color
-    valid_moves = get_valid_moves(board, current_color)
+    if valid_moves is None:
+        valid_moves = get_valid_moves(board, current_color)
 
     if not valid_moves:
+        # 終局局面のキャッシュにあれば相手の有効手を調べずに返す
+        cells = flatten(board)
+        score = cached_terminal_score(_terminal_cache, cells, color)
+        if score is not None:
+            return score, None
         # パスする場合
         opponent_moves = get_valid_moves(board, 3 - current_color)
         if not opponent_moves:
             # ゲーム終了
-            return evaluate_board(board, color if maximizing_player else 3 - color), None
+            limit = terminal_cache_limit(len(cells))
+            return store_terminal_score(_terminal_cache, cells, color, limit), None
         else:
-            # 相手のターン
-            eval_score, _ = minimax(board, depth - 1, not maximizing_player, color, alpha, beta)
+            # 相手のターン（計算した相手の有効手をそのまま使う）
+            eval_score, _ = minimax(board, depth - 1, not maximizing_player, color, alpha, beta,
+                                    opponent_moves)
             return eval_score, None
 
     best_move = None
@@ -438,7 +730,7 @@ def minimax(board, depth, maximizing_player, color, alpha=float('-inf'), beta=fl
             x, y = move
             # 手を試す
             test_board = copy(board)
-            move_stone(test_board, current_color, x, y)
+            place(test_board, current_color, x, y)
 
             eval_score, _ = minimax(test_board, depth - 1, False, color, alpha, beta)
 
@@ -458,7 +750,7 @@ def minimax(board, depth, maximizing_player, color, alpha=float('-inf'), beta=fl
             x, y = move
             # 手を試す
             test_board = copy(board)
-            move_stone(test_board, current_color, x, y)
+            place(test_board, current_color, x, y)
 
             eval_score, _ = minimax(test_board, depth - 1, True, color, alpha, beta)
 
@@ -0,0 +1,151 @@
+"""
+先読み（ポンダリング）
+
+自分の手を返したあと、相手が考えている間もバックグラウンドで探索を続ける。
+探索結果は SearchEngine の置換表に蓄えられ、相手の実際の手が来たときは
+その局面の探索を置換表に残った結果を使って再開する（正確な値が残っていればその深さから、
+境界値だけなら深さ1から始め、浅い深さは置換表によりすぐ終わる）。
+
+先読みモード:
+- "predicted": PVで予想した相手の応手の後の局面（自分の手番）を探索
+- "all": 相手の手番の局面を探索し、相手のすべての応手を読んでおく
+"""
+
+import threading
+
+try:
+    from .movegen import legal_moves
+    from .search import SearchEngine, play_move
+except ImportError:
+    from movegen import legal_moves
+    from search import SearchEngine, play_move
+
+
+PONDER_MODES = ("predicted", "all")
+
+
+class Ponderer:
+    """
+    先読み付き思考エンジン
+
+    think() で手を決めると、その直後から相手の手番中の先読みを開始する。
+    次の think() 呼び出し時、または stop() で先読みは停止する。
+    """
+
+    def __init__(self, engine=None, mode="predicted"):
+        if mode not in PONDER_MODES:
+            raise ValueError(f"mode must be one of {PONDER_MODES}: {mode!r}")
+        self.engine = engine if engine is not None else SearchEngine()
+        self.mode = mode
+        self.ponder_board = None
+        self.ponder_color = None
+        self.ponder_result = None
+        self._thread = None
+
+    def think(self, board, color, time_budget=1.0, max_depth=None):
+        """
+        先読みを止めて最善手を探索し、その後の先読みを開始する
+
+        Args:
+            board: 2次元配列のオセロボード
+            color: 自分の色
+            time_budget: 制限時間（秒）
+            max_depth: 最大探索深さ（Noneなら空きマス数まで）
+
+        Returns:
+            SearchResult: 探索結果
+        """
+        self.stop()
+        result = self.engine.search(board, color, max_depth=max_depth, time_budget=time_budget)
+        if result.move is not None:
+            self.start(play_move(board, color, *result.move), 3 - color, result.pv[1:])
+        return result
+
+    def start(self, board, color, expected_pv=()):
+        """
+        相手の手番の局面から先読みを開始する
+
+        Args:
+            board: 自分が手を打った後のボード
+            color: 相手の色（この局面の手番）
+            expected_pv: 予想される以降の手順（"predicted"モードで使用、パスは含まない）
+        """
+        self.stop()
+        if self.mode == "predicted":
+            # PVはパスを含まないため、先頭が相手の合法手でなければ予想できない
+            if not expected_pv or tuple(expected_pv[0]) not in legal_moves(board, color):
+                return
+            board = play_move(board, color, *expected_pv[0])
+            color = 3 - color
+
+        self.ponder_board = board
+        self.ponder_color = color
+        self.ponder_result = None
+        self.engine.clear_stop()
+        self._thread = threading.Thread(target=self._run, args=(board, color), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        先読みを停止する（先読み中でなければ何もしない）
+
+        Returns:
+            SearchResult または None: 停止までに完了した先読みの結果
+        """
+        if self._thread is not None:
+            # 先読みのスレッドが探索を始める前でも、停止要求は探索の開始後まで残る
+            self.engine.stop()
+            self._thread.join()
+            self._thread = None
+            self.engine.clear_stop()
+        return self.ponder_result
+
+    def is_pondering(self):
+        """先読み中かどうか"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def memory_usage(self):
+        """探索エンジンの置換表の実際のメモリ使用量（SearchEngine.memory_usage() と同じ形式）"""
+        return self.engine.memory_usage()
+
+    def _run(self, board, color):
+        self.ponder_result = self.engine.search(board, color)
+
+
+_default_ponderer = None
+
+
+def get_default_ponderer():
+    """myai_ponder が使う共有の Ponderer を取得"""
+    global _default_ponderer
+    if _default_ponderer is None:
+        _default_ponderer = Ponderer()
+    return _default_ponderer
+
+
+def stop_pondering():
+    """myai_ponder の先読みを停止する"""
+    if _default_ponderer is not None:
+        _default_ponderer.stop()
+
+
+def myai_ponder(board, color, time_budget=1.0, config=None):
+    """
+    先読みAI: 相手の手番中も探索を続け、その結果を次の手で再利用する
+
+    Args:
+        board: 2次元配列のオセロボード
+        color: 自分の色 (BLACK=1, WHITE=2)
+        time_budget: 1手あたりの制限時間（秒）
+        config: この呼び出し（と、その後の先読み）のメモリ設定 EngineConfig（Noneなら既定の設定）
+
+    Returns:
+        (column, row): 最適手
+    """
+    ponderer = get_default_ponderer()
+    # 前回の先読みを止めてから、設定をこの呼び出しにだけ適用する
+    # （置換表は探索の開始時に新しい上限に収める）
+    ponderer.stop()
+    ponderer.engine.config = config
+    result = ponderer.think(board, color, time_budget)
+    return result.move if result.move else (0, 0)
@@ -0,0 +1,296 @@
+"""
+ProbCut（Multi-ProbCut）のパラメータと較正ツール
+
+深さ d の探索値 v_d を、同じ局面の浅い深さ s の探索値 v_s から
+    v_d ≈ a * v_s + b （予測誤差の標準偏差 sigma）
+と予測する。パラメータ (s, a, b, sigma) はボードサイズ・局面（序盤・中盤・終盤）・
+深さ d の組ごとに、局面集に対する探索結果から最小二乗法で求める。
+評価値の大きさと予測誤差はボードサイズによって異なるため、
+較正していないボードサイズでは ProbCut を使わない。
+
+較正結果は probcut_params.json にボードサイズごとに保存され、最初に使われたときに
+DEFAULT_PROBCUT_PARAMS に重ねて読み込まれる（ファイルにあるボードサイズだけ置き換える）。
+
+使い方（較正）:
+    python probcut.py --size 6 --positions 200 --max-depth 8
+    python probcut.py --records games.ogr --positions 500
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+
+
+PARAMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "probcut_params.json")
+
+# ProbCut を試す最小の深さ
+PROBCUT_MIN_DEPTH = 3
+
+# 枝刈りの閾値（予測誤差の標準偏差の何倍の余裕をとるか）
+PROBCUT_T = 1.0
+
+# 深い探索の深さ → 予測に使う浅い探索の深さ
+DEPTH_PAIRS = {3: 1, 4: 2, 5: 2, 6: 3, 7: 3, 8: 4}
+
+# 既定のパラメータ {ボードサイズ: {局面: {深さ: (浅い深さ, a, b, sigma)}}}
+DEFAULT_PROBCUT_PARAMS = {
+    # python probcut.py --size 6 --positions 300 --max-depth 8
+    "6x6": {
+        "beginning": {
+            3: (1, 0.8823, 0.743, 7.837),
+            4: (2, 0.8955, 0.396, 5.201),
+            5: (2, 0.9045, -5.934, 7.005),
+            6: (3, 0.8776, 6.977, 6.473),
+            7: (3, 0.8369, -3.693, 7.056),
+            8: (4, 0.8369, 4.914, 5.313),
+        },
+        "midgame": {
+            3: (1, 0.7194, 6.657, 33.063),
+            4: (2, 0.7407, -2.448, 32.371),
+            5: (2, 0.4053, 16.583, 47.192),
+            6: (3, 0.4754, -1.386, 43.16),
+            7: (3, 0.6533, 25.927, 57.643),
+            8: (4, 0.6149, 3.23, 55.175),
+        },
+        "endgame": {
+            3: (1, 0.8809, 7.87, 58.152),
+            4: (2, 0.9683, 10.633, 52.765),
+            5: (2, 0.9819, 81.281, 67.421),
+            6: (3, 1.0633, -82.395, 61.065),
+            7: (3, 0.9879, -3.832, 73.683),
+            8: (4, 0.9176, 6.738, 84.148),
+        },
+    },
+    # python probcut.py --size 8 --positions 300 --max-depth 8
+    "8x8": {
+        "beginning": {
+            3: (1, 0.94, -0.735, 4.735),
+            4: (2, 0.946, -1.159, 5.14),
+            5: (2, 0.9184, 9.963, 6.094),
+            6: (3, 0.8811, -11.017, 5.613),
+            7: (3, 0.8831, 0.742, 6.489),
+            8: (4, 0.8976, -2.104, 5.994),
+        },
+        "midgame": {
+            3: (1, 0.8309, 8.319, 35.396),
+            4: (2, 0.5978, -8.134, 52.856),
+            5: (2, 0.3373, 32.31, 57.042),
+            6: (3, 0.3975, -25.671, 59.113),
+            7: (3, 0.4945, 28.567, 62.955),
+            8: (4, 0.7032, -9.473, 46.501),
+        },
+        "endgame": {
+            3: (1, 0.7357, 16.403, 65.537),
+            4: (2, 0.8287, -7.108, 68.174),
+            5: (2, 0.7657, 120.004, 82.803),
+            6: (3, 0.7545, -124.832, 89.595),
+            7: (3, 0.768, -4.654, 99.982),
+            8: (4, 0.9101, -19.324, 109.417),
+        },
+    },
+}
+
+# 読み込んだパラメータ {ボードサイズ: {(局面, 深さ): (浅い深さ, a, b, sigma)}}
+_probcut_params = None
+
+
+def game_phase(cells):
+    """
+    空きマスの割合から局面を判定（myai_adaptive_depth と同じ区切り）
+
+    Args:
+        cells: 1次元配列の盤面
+
+    Returns:
+        str: 'beginning', 'midgame', 'endgame'
+    """
+    progress = 1 - cells.count(0) / len(cells)
+    if progress < 0.3:
+        return "beginning"
+    elif progress < 0.7:
+        return "midgame"
+    else:
+        return "endgame"
+
+
+def board_size_key(rows, cols):
+    """パラメータのボードサイズのキー（"8x8" など）"""
+    return f"{rows}x{cols}"
+
+
+def _to_lookup(params):
+    return {size: {(phase, int(depth)): tuple(values)
+                   for phase, by_depth in by_phase.items()
+                   for depth, values in by_depth.items()}
+            for size, by_phase in params.items()}
+
+
+def load_probcut_params(path=PARAMS_PATH):
+    """
+    既定のパラメータに較正結果のファイルを重ねたパラメータを読み込む
+
+    Args:
+        path: 較正結果のファイル（なければ既定のパラメータのみ）
+
+    Returns:
+        dict: {ボードサイズ: {局面: {深さ: (浅い深さ, a, b, sigma)}}}
+    """
+    params = dict(DEFAULT_PROBCUT_PARAMS)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            params.update(json.load(f))
+    return params
+
+
+def get_probcut_params(rows, cols):
+    """
+    ボードサイズの ProbCut のパラメータを取得（最初の呼び出し時に読み込む）
+
+    Args:
+        rows: 行数
+        cols: 列数
+
+    Returns:
+        dict: {(局面, 深さ): (浅い深さ, a, b, sigma)}（較正していないボードサイズなら空）
+    """
+    global _probcut_params
+    if _probcut_params is None:
+        _probcut_params = _to_lookup(load_probcut_params())
+    return _probcut_params.get(board_size_key(rows, cols), {})
+
+
+def set_probcut_params(params):
+    """
+    ProbCut のパラメータを差し替える
+
+    Args:
+        params: {ボードサイズ: {局面: {深さ: (浅い深さ, a, b, sigma)}}}
+                （None なら次回の使用時に読み込み直す）
+    """
+    global _probcut_params
+    _probcut_params = _to_lookup(params) if params is not None else None
+
+
+def fit_line(samples):
+    """
+    最小二乗法で y ≈ a * x + b を求める
+
+    Args:
+        samples: (x, y) のリスト
+
+    Returns:
+        (a, b, sigma): 傾き、切片、残差の標準偏差
+    """
+    xs = [x for x, _ in samples]
+    ys = [y for _, y in samples]
+    mean_x = statistics.fmean(xs)
+    mean_y = statistics.fmean(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        a = 1.0
+    else:
+        a = sum((x - mean_x) * (y - mean_y) for x, y in samples) / var_x
+    b = mean_y - a * mean_x
+    residuals = [y - (a * x + b) for x, y in samples]
+    sigma = statistics.pstdev(residuals) if len(residuals) > 1 else 0.0
+    return a, b, sigma
+
+
+def calibrate(positions, max_depth=8, min_samples=10):
+    """
+    局面集の探索結果から ProbCut のパラメータを求める
+
+    Args:
+        positions: (ボード, 手番の色) の反復可能オブジェクト
+        max_depth: 較正する最大の深さ
+        min_samples: パラメータを求めるのに必要な最小の局面数
+
+    Returns:
+        dict: {ボードサイズ: {局面: {深さ: [浅い深さ, a, b, sigma]}}}
+        （局面集に複数のボードサイズがあれば、ボードサイズごとに求める）
+    """
+    try:
+        from .movegen import flatten
+        from .myai import is_terminal_score
+        from .search import SearchEngine
+    except ImportError:
+        from movegen import flatten
+        from myai import is_terminal_score
+        from search import SearchEngine
+
+    pairs = {deep: shallow for deep, shallow in DEPTH_PAIRS.items() if deep <= max_depth}
+    depths = sorted(set(pairs) | set(pairs.values()))
+    samples = {}
+    engine = SearchEngine(selective=False)
+    for board, color in positions:
+        size = board_size_key(len(board), len(board[0]))
+        phase = game_phase(flatten(board))
+        engine.clear()
+        # 浅い順に探索する（反復深化と同じく、前の深さの置換表を手の並べ替えに使う）
+        scores = {depth: engine.search_score(board, color, depth) for depth in depths}
+        for deep, shallow in pairs.items():
+            if is_terminal_score(scores[shallow]) or is_terminal_score(scores[deep]):
+                # 終局まで読み切った値は予測式の較正に使わない
+                continue
+            samples.setdefault((size, phase, deep), []).append((scores[shallow], scores[deep]))
+
+    params = {}
+    for (size, phase, deep), pair_samples in sorted(samples.items()):
+        if len(pair_samples) < min_samples:
+            continue
+        a, b, sigma = fit_line(pair_samples)
+        params.setdefault(size, {}).setdefault(phase, {})[str(deep)] = [
+            pairs[deep], round(a, 4), round(b, 3), round(sigma, 3)]
+    return params
+
+
+def main(argv=None):
+    """コマンドラインのエントリポイント（較正ツール）"""
+    parser = argparse.ArgumentParser(description="ProbCut パラメータの較正")
+    parser.add_argument("--size", type=int, default=6, help="局面集のボードサイズ")
+    parser.add_argument("--positions", type=int, default=200, help="局面数")
+    parser.add_argument("--seed", type=int, default=0, help="局面集の乱数シード")
+    parser.add_argument("--records", nargs="*", default=None, help="局面を取り出す棋譜ファイル")
+    parser.add_argument("--max-depth", type=int, default=8, help="較正する最大の深さ")
+    parser.add_argument("--out", default=PARAMS_PATH, help="出力ファイル")
+    args = parser.parse_args(argv)
+
+    if args.records:
+        try:
+            from .analysis import iter_positions
+            from .movegen import unflatten
+        except ImportError:
+            from analysis import iter_positions
+            from movegen import unflatten
+        positions = []
+        for _, _, size, cells, color, _ in iter_positions(args.records):
+            positions.append((unflatten(list(cells), size), color))
+            if len(positions) >= args.positions:
+                break
+    else:
+        try:
+            from .benchmark import make_corpus
+        except ImportError:
+            from benchmark import make_corpus
+        positions = make_corpus(args.size, args.positions, args.seed)
+
+    params = calibrate(positions, args.max_depth)
+    # 較正したボードサイズだけを置き換え、他のボードサイズの較正結果は残す
+    saved = {}
+    if os.path.exists(args.out):
+        with open(args.out, encoding="utf-8") as f:
+            saved = json.load(f)
+    saved.update(params)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(saved, f, indent=2)
+    for size, by_phase in params.items():
+        for phase, by_depth in by_phase.items():
+            for depth, (shallow, a, b, sigma) in by_depth.items():
+                print(f"{size:6s} {phase:10s} {shallow}->{depth}: a={a:.3f} b={b:.2f} sigma={sigma:.2f}")
+    print(f"saved: {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+プロファイラ
+
+ベンチマークと同じ局面集（コーパス）に対して myai_* 関数を実行し、
+どの関数に時間がかかっているかを関数ごとに集計する。
+
+- cprofile: cProfile による決定的な計測。関数ごとの呼び出し回数・自己時間・累積時間と、
+  探索ノード1つあたりの呼び出し回数を出す
+- sampling: 一定間隔で呼び出し履歴（スタック）を記録する。計測による遅れが小さく、
+  フレームグラフ用の collapsed stacks 形式（"関数;関数;関数 回数"）で書き出せる
+
+結果の JSON はコミット間で比較できる（--compare）。
+
+使い方:
+    python profiler.py --player myai_minimax_shallow
+    python profiler.py --player myai_adaptive_depth --json prof.json
+    python profiler.py --player myai_selective --mode sampling --collapsed prof.folded
+    python profiler.py --player myai_minimax_shallow --compare prof.json
+    flamegraph.pl prof.folded > prof.svg
+"""
+
+import argparse
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+
+try:
+    from .benchmark import make_corpus, resolve_players
+    from .othello_utils import copy
+except ImportError:
+    from benchmark import make_corpus, resolve_players
+    from othello_utils import copy
+
+
+PROFILE_MODES = ("cprofile", "sampling")
+
+# 探索ノード1つにつき1回呼ばれる関数（ノード数の計測に使う）
+NODE_FUNCTIONS = ("myai.py:minimax", "search.py:SearchEngine._negamax", "mcts.py:MCTS._iterate")
+
+DEFAULT_INTERVAL = 0.001
+
+
+def function_label(filename, name):
+    """
+    関数の表示名 "ファイル名:関数名"（行番号を含めないので、コミット間で比較できる）
+
+    Args:
+        filename: ソースファイルのパス（組み込み関数は "~"）
+        name: 関数名（メソッドは "クラス名.関数名"）
+
+    Returns:
+        str: 表示名
+    """
+    if filename == "~":
+        return name
+    return f"{os.path.basename(filename)}:{name}"
+
+
+def _code_label(code):
+    return function_label(code.co_filename, getattr(code, "co_qualname", code.co_name))
+
+
+def _run_corpus(player, corpus, repeats=1):
+    for _ in range(repeats):
+        for board, color in corpus:
+            player(copy(board), color)
+
+
+def profile_cprofile(player, corpus, repeats=1):
+    """
+    cProfile で局面集に対する player の実行を計測
+
+    Args:
+        player: AI関数
+        corpus: make_corpus() の結果
+        repeats: 局面集を繰り返す回数
+
+    Returns:
+        (関数ごとの集計, 経過時間): 集計は {表示名: {"calls", "self_s", "cumulative_s"}}
+    """
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        _run_corpus(player, corpus, repeats)
+    finally:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+
+    # cProfile は関数を (ファイル名, 行番号, 関数名) で区別する。メソッドのクラス名は
+    # 含まれないため、計測した関数のコードオブジェクトから補う
+    qualnames = {}
+    for entry in profiler.getstats():
+        code = entry.code
+        if not isinstance(code, str):
+            qualnames[(code.co_filename, code.co_firstlineno, code.co_name)] = \
+                getattr(code, "co_qualname", code.co_name)
+
+    functions = {}
+    for (filename, lineno, name), (_, calls, self_s, cumulative_s, _) in pstats.Stats(profiler).stats.items():
+        label = function_label(filename, qualnames.get((filename, lineno, name), name))
+        total = functions.setdefault(label, {"calls": 0, "self_s": 0.0, "cumulative_s": 0.0})
+        total["calls"] += calls
+        total["self_s"] += self_s
+        total["cumulative_s"] += cumulative_s
+    return functions, elapsed
+
+
+class StackSampler:
+    """
+    別スレッドから一定間隔で対象スレッドの呼び出し履歴を記録するサンプリングプロファイラ
+
+    スタックは根（呼び出し元）から葉（実行中の関数）の順の表示名のタプルで記録する。
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL):
+        self.interval = interval
+        self.stacks = {}
+        self.samples = 0
+        self._target = None
+        self._root_code = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self, root_code=None):
+        """
+        呼び出したスレッドの記録を開始
+
+        Args:
+            root_code: このコードオブジェクトより呼び出し元のフレームは記録しない
+        """
+        self._target = threading.get_ident()
+        self._root_code = root_code
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """記録を停止"""
+        self._stop_event.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None and frame.f_code is not self._root_code:
+                stack.append(_code_label(frame.f_code))
+                frame = frame.f_back
+            if not stack or (self._root_code is not None and frame is None):
+                # 計測対象の外（開始前・終了後）
+                continue
+            stack = tuple(reversed(stack))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+
+def profile_sampling(player, corpus, repeats=1, interval=DEFAULT_INTERVAL):
+    """
+    サンプリングで局面集に対する player の実行を計測
+
+    Args:
+        player: AI関数
+        corpus: make_corpus() の結果
+        repeats: 局面集を繰り返す回数（速いAIでサンプル数を増やす）
+        interval: 記録の間隔（秒）
+
+    Returns:
+        (関数ごとの集計, 経過時間, スタックごとの回数):
+        集計は {表示名: {"samples", "self_s", "cumulative_s"}}（時間は回数からの推定値）
+    """
+    sampler = StackSampler(interval)
+    # 他のスレッドへの切り替え間隔を記録の間隔に合わせる（既定の5ミリ秒では粗すぎる）
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(min(switch_interval, interval))
+    start = time.perf_counter()
+    sampler.start(_run_corpus.__code__)
+    try:
+        _run_corpus(player, corpus, repeats)
+    finally:
+        sampler.stop()
+        sys.setswitchinterval(switch_interval)
+    elapsed = time.perf_counter() - start
+
+    per_sample = elapsed / sampler.samples if sampler.samples else 0.0
+    functions = {}
+    for stack, count in sampler.stacks.items():
+        for label in set(stack):
+            total = functions.setdefault(label, {"samples": 0, "self_s": 0.0, "cumulative_s": 0.0})
+            total["cumulative_s"] += count * per_sample
+        leaf = functions[stack[-1]]
+        leaf["samples"] += count
+        leaf["self_s"] += count * per_sample
+    return functions, elapsed, sampler.stacks
+
+
+def count_nodes(functions):
+    """
+    探索ノード数（NODE_FUNCTIONS の呼び出し回数の合計、cprofile の集計のみ）
+
+    Returns:
+        int または None（ノード関数が呼ばれていない場合）
+    """
+    nodes = sum(functions[label]["calls"] for label in NODE_FUNCTIONS if label in functions)
+    return nodes or None
+
+
+def write_collapsed(stacks, path):
+    """
+    collapsed stacks 形式（flamegraph.pl・speedscope などの入力）で書き出す
+
+    Args:
+        stacks: {スタックのタプル: 回数}
+        path: 出力ファイル
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in sorted(stacks.items()):
+            f.write(";".join(stack) + f" {count}\n")
+
+
+def profile_player(name, mode="cprofile", board_size=6, positions=20, seed=0, repeats=1,
+                   interval=DEFAULT_INTERVAL):
+    """
+    局面集に対して myai_* 関数をプロファイルする
+
+    Args:
+        name: myai_* 関数名
+        mode: 'cprofile' または 'sampling'
+        board_size: 局面集のボードサイズ
+        positions: 局面数
+        seed: 局面集の乱数シード
+        repeats: 局面集を繰り返す回数
+        interval: sampling の記録間隔（秒）
+
+    Returns:
+        (集計の辞書, スタックごとの回数): スタックは sampling のときのみ（それ以外は None）
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"mode must be one of {PROFILE_MODES}: {mode!r}")
+    player = resolve_players([name])[name]
+    corpus = make_corpus(board_size, positions, seed)
+
+    stacks = None
+    if mode == "cprofile":
+        functions, elapsed = profile_cprofile(player, corpus, repeats)
+    else:
+        functions, elapsed, stacks = profile_sampling(player, corpus, repeats, interval)
+
+    # myai_ponder の先読みスレッドが残らないようにする
+    ponder = sys.modules.get(f"{__package__}.ponder" if __package__ else "ponder")
+    if ponder is not None:
+        ponder.stop_pondering()
+
+    nodes = count_nodes(functions) if mode == "cprofile" else None
+    for stats in functions.values():
+        if nodes:
+            stats["calls_per_node"] = round(stats["calls"] / nodes, 4)
+        for key in ("self_s", "cumulative_s"):
+            stats[key] = round(stats[key], 6)
+
+    summary = {
+        "player": name,
+        "mode": mode,
+        "board_size": board_size,
+        "positions": positions,
+        "seed": seed,
+        "repeats": repeats,
+        "total_s": round(elapsed, 6),
+        "nodes": nodes,
+        "functions": dict(sorted(functions.items(), key=lambda item: -item[1]["self_s"])),
+    }
+    if mode == "sampling":
+        summary["interval"] = interval
+        summary["samples"] = sum(stacks.values())
+    return summary, stacks
+
+
+def format_summary(summary, top=25):
+    """集計を自己時間の長い順の表にする"""
+    lines = [f"{summary['player']} ({summary['mode']}): {summary['total_s']:.3f} 秒"
+             + (f", {summary['nodes']} ノード" if summary["nodes"] else "")]
+    if summary["mode"] == "cprofile":
+        lines.append(f"{'関数':48s} {'呼び出し':>10s} {'/ノード':>9s} {'自己(秒)':>9s} {'累積(秒)':>9s}")
+    else:
+        lines.append(f"{'関数':48s} {'サンプル':>10s} {'':>9s} {'自己(秒)':>9s} {'累積(秒)':>9s}")
+    for label, stats in list(summary["functions"].items())[:top]:
+        count = stats.get("calls", stats.get("samples"))
+        per_node = f"{stats['calls_per_node']:9.3f}" if "calls_per_node" in stats else " " * 9
+        lines.append(f"{label[:48]:48s} {count:10d} {per_node} {stats['self_s']:9.4f} {stats['cumulative_s']:9.4f}")
+    return "\n".join(lines)
+
+
+def compare_summaries(baseline, current, top=25):
+    """
+    2つの集計を比較して、自己時間と1ノードあたりの呼び出し回数の変化を表にする
+
+    Args:
+        baseline: 基準の集計（profile_player() の結果）
+        current: 比較する集計
+        top: 表示する関数の数（どちらかの自己時間の長い順）
+
+    Returns:
+        str: 比較結果
+    """
+    lines = [f"合計 {baseline['total_s']:.3f} -> {current['total_s']:.3f} 秒"]
+    if baseline.get("nodes") and current.get("nodes"):
+        lines[0] += f", ノード {baseline['nodes']} -> {current['nodes']}"
+    old_functions = baseline["functions"]
+    new_functions = current["functions"]
+    labels = sorted(set(old_functions) | set(new_functions),
+                    key=lambda label: -max(old_functions.get(label, {}).get("self_s", 0.0),
+                                           new_functions.get(label, {}).get("self_s", 0.0)))
+    lines.append(f"{'関数':48s} {'自己(秒)':>21s} {'/ノード':>19s}")
+    for label in labels[:top]:
+        old = old_functions.get(label, {})
+        new = new_functions.get(label, {})
+        old_self = old.get("self_s", 0.0)
+        new_self = new.get("self_s", 0.0)
+        per_node = ""
+        if "calls_per_node" in old or "calls_per_node" in new:
+            per_node = f"{old.get('calls_per_node', 0):8.3f} -> {new.get('calls_per_node', 0):8.3f}"
+        lines.append(f"{label[:48]:48s} {old_self:8.4f} -> {new_self:8.4f} {per_node}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    """コマンドラインのエントリポイント"""
+    parser = argparse.ArgumentParser(description="オセロAI プロファイラ")
+    parser.add_argument("--player", default="myai_minimax_shallow", help="計測するAI関数名")
+    parser.add_argument("--mode", choices=PROFILE_MODES, default="cprofile", help="計測方法")
+    parser.add_argument("--size", type=int, default=6, help="ボードサイズ")
+    parser.add_argument("--positions", type=int, default=20, help="局面数")
+    parser.add_argument("--seed", type=int, default=0, help="局面集の乱数シード")
+    parser.add_argument("--repeats", type=int, default=1, help="局面集を繰り返す回数")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="sampling の記録間隔（秒）")
+    parser.add_argument("--top", type=int, default=25, help="表示する関数の数")
+    parser.add_argument("--json", default=None, help="集計を書き出すJSONファイル")
+    parser.add_argument("--collapsed", default=None, help="collapsed stacks を書き出すファイル（sampling のみ）")
+    parser.add_argument("--compare", default=None, help="比較する集計のJSONファイル")
+    args = parser.parse_args(argv)
+    if args.collapsed and args.mode != "sampling":
+        parser.error("--collapsed requires --mode sampling")
+
+    summary, stacks = profile_player(args.player, args.mode, args.size, args.positions,
+                                     args.seed, args.repeats, args.interval)
+    print(format_summary(summary, args.top))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=1)
+    if args.collapsed:
+        write_collapsed(stacks, args.collapsed)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print()
+        print(compare_summaries(baseline, summary, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""
+探索エンジン
+
+置換表（トランスポジションテーブル）と最善応手列（PV）を持つ
+反復深化アルファベータ探索（ネガマックス形式）を提供する。
+探索は途中で停止でき、置換表は探索をまたいで保持されるため、
+先読み（ponder.py）で蓄えた結果をそのまま次の探索で再利用できる。
+
+selective=True にすると ProbCut（Multi-ProbCut）による選択的探索を行う。
+浅い探索の結果から深い探索の結果を予測し、ほぼ確実に枝刈りされる枝を
+深く読まずに打ち切る。予測の回帰パラメータは probcut.py でボードサイズごとに較正し、
+較正していないボードサイズでは厳密な探索と同じになる。
+
+制限時間の代わりにノード数の上限（node_limit）を指定すると、探索結果は
+実行環境の速さに左右されない。seed を指定すると、置換表の手（前の深さの最善手）の
+次に試す手の順をシードで決める。同じ評価値の手は先に試した手が選ばれるため、
+前の深さの最善手と並んだ手はその最善手に、それ以外はシードで決まる順に決まる。
+置換表を空にした状態から同じ条件で探索すれば、
+最善手・PV・ノード数は毎回一致する（決定的モード）。
+各深さの PV とノード数は trace に記録され、バージョン間の比較に使える。
+
+終局局面は石数で正確に評価する（myai.terminal_score()、絶対値が WIN_SCORE 以上）。
+終局局面はエンジンごとの小さなキャッシュにも記録し、2回目以降は有効手を調べずに返す。
+"""
+
+import math
+import random
+import threading
+import time
+from collections import namedtuple
+
+try:
+    from .engine_config import (deep_sizeof, dict_entry_bytes, entry_limit, evict_entries,
+                                get_default_config, store_entry, trim_table_caches)
+    from .myai import (cached_terminal_score, evaluate_position, get_blended_eval_table,
+                       is_terminal_score, store_terminal_score, terminal_cache_limit)
+    from .movegen import flatten, get_rays, place, play, undo, valid_moves
+    from .othello_utils import copy
+    from .probcut import PROBCUT_MIN_DEPTH, PROBCUT_T, game_phase, get_probcut_params
+except ImportError:
+    from engine_config import (deep_sizeof, dict_entry_bytes, entry_limit, evict_entries,
+                               get_default_config, store_entry, trim_table_caches)
+    from myai import (cached_terminal_score, evaluate_position, get_blended_eval_table,
+                      is_terminal_score, store_terminal_score, terminal_cache_limit)
+    from movegen import flatten, get_rays, place, play, undo, valid_moves
+    from othello_utils import copy
+    from probcut import PROBCUT_MIN_DEPTH, PROBCUT_T, game_phase, get_probcut_params
+
+
+INF = float('inf')
+
+# 置換表エントリの種類
+EXACT = 0  # 正確な値
+LOWER = 1  # 下限値（ベータカット）
+UPPER = 2  # 上限値（アルファ値を超えなかった）
+
+# 停止フラグと制限時間を確認する間隔（ノード数、2のべき乗-1）
+CHECK_INTERVAL = 1023
+
+SearchResult = namedtuple('SearchResult', ['move', 'score', 'depth', 'pv', 'nodes'])
+
+# シードごとの手の優先順位のキャッシュ {(マス数, シード): 優先順位のリスト}
+_move_orders = {}
+
+
+class SearchAborted(Exception):
+    """停止要求または制限時間により探索が打ち切られたことを示す例外"""
+
+
+def board_key(cells, color):
+    """
+    置換表のキーを作成
+
+    Args:
+        cells: 1次元配列の盤面
+        color: 手番の色
+
+    Returns:
+        bytes: 盤面と手番を表すキー
+    """
+    return bytes(cells) + bytes((color,))
+
+
+def tt_entry_bytes(squares):
+    """
+    置換表1エントリあたりのメモリ使用量の見積もり（バイト）
+
+    キー（盤面のバイト列）・値のタプル・評価値・辞書の領域の合計。
+
+    Args:
+        squares: マス数
+
+    Returns:
+        int: バイト数
+    """
+    return dict_entry_bytes(bytes(squares + 1), (0, 0, 0, 0), 1 << 10)
+
+
+def seeded_move_order(size, seed):
+    """
+    シードから決まるマスの優先順位を取得（キャッシュ付き）
+
+    置換表の手の次に、優先順位の高い（値の小さい）手から試す。
+
+    Args:
+        size: マス数
+        seed: 乱数のシード
+
+    Returns:
+        list: マス番号 → 優先順位
+    """
+    key = (size, seed)
+    order = _move_orders.get(key)
+    if order is None:
+        squares = list(range(size))
+        random.Random(seed).shuffle(squares)
+        order = [0] * size
+        for rank, square in enumerate(squares):
+            order[square] = rank
+        _move_orders[key] = order
+    return order
+
+
+def play_move(board, color, x, y):
+    """
+    手を打った後の盤面を新しく作成（元の盤面は変更しない）
+
+    Args:
+        board: 2次元配列のオセロボード
+        color: 石の色
+        x: 列位置
+        y: 行位置
+
+    Returns:
+        手を打った後のボード
+    """
+    new_board = copy(board)
+    place(new_board, color, x, y)
+    return new_board
+
+
+class SearchEngine:
+    """
+    置換表付き反復深化アルファベータ探索エンジン
+
+    置換表はインスタンスが保持し、search() を呼ぶたびに再利用される。
+    探索中は盤面を1次元配列で持ち、着手と取り消し（play/undo）で更新する。
+    置換表の手はマス番号（y * cols + x）で記録する。
+    stop() は別スレッドから呼び出してよい。停止要求は clear_stop() を呼ぶまで有効で、
+    探索の開始前に要求した場合もその探索を止める。
+    置換表の大きさは config.tt_bytes を上限とし、上限に達すると最後に記録した時刻の
+    古いエントリのうち、探索深さの浅いものから捨てる。
+    終局局面のキャッシュ（terminal_cache）は config.terminal_cache_bytes を上限とする。
+    """
+
+    def __init__(self, selective=False, probcut_t=PROBCUT_T, seed=None, config=None):
+        """
+        Args:
+            selective: ProbCut による選択的探索を行うか（Falseなら厳密な探索）
+            probcut_t: 枝刈りの閾値（予測誤差の標準偏差の何倍まで許すか）
+            seed: 置換表の手の次に試す手の順を決めるシード（Noneならマス番号順）
+            config: メモリ設定 EngineConfig（Noneなら既定の設定）
+        """
+        self.tt = {}
+        self.terminal_cache = {}
+        self.nodes = 0
+        self.trace = []
+        self.probcut_t = probcut_t
+        self.seed = seed
+        self.config = config
+        self._selective = selective
+        self._in_probcut = False
+        self._stop_event = threading.Event()
+        self._deadline = None
+        self._node_limit = None
+        self._next_check = CHECK_INTERVAL
+        self._order = None
+        self._rays = None
+        self._weights = None
+        self._probcut_params = {}
+        self._tt_limit = math.inf
+        self._terminal_limit = math.inf
+
+    @property
+    def selective(self):
+        """ProbCut による選択的探索を行うか"""
+        return self._selective
+
+    @selective.setter
+    def selective(self, value):
+        # 選択的探索の結果と厳密な探索の結果を混ぜないよう、切り替え時は置換表を空にする
+        if bool(value) != self._selective:
+            self.tt.clear()
+        self._selective = bool(value)
+
+    def clear(self):
+        """置換表と終局局面のキャッシュを空にする"""
+        self.tt.clear()
+        self.terminal_cache.clear()
+
+    def memory_usage(self):
+        """
+        置換表と終局局面のキャッシュの実際のメモリ使用量
+
+        Returns:
+            dict: {"tt": {"bytes": 実測値, "budget": 上限}, "terminal_cache": {...}}
+        """
+        config = self.config or get_default_config()
+        return {"tt": {"bytes": deep_sizeof(self.tt), "budget": config.tt_bytes},
+                "terminal_cache": {"bytes": deep_sizeof(self.terminal_cache),
+                                   "budget": config.terminal_cache_bytes}}
+
+    def stop(self):
+        """実行中の探索（開始前なら次の探索）に停止を要求する"""
+        self._stop_event.set()
+
+    def clear_stop(self):
+        """停止要求を取り消す（探索していないときに呼ぶ）"""
+        self._stop_event.clear()
+
+    def search(self, board, color, max_depth=None, time_budget=None, start_depth=None,
+               node_limit=None):
+        """
+        反復深化で最善手を探索
+
+        置換表にこの局面の正確な値（EXACT）が残っていれば、その深さから探索を再開する。
+        境界値（先読みの途中で記録されたものなど）しかなければ深さ1から始める
+        （浅い深さは置換表によりほとんど時間がかからない）。
+        各深さの結果は self.trace に記録する。
+
+        Args:
+            board: 2次元配列のオセロボード
+            color: 手番の色
+            max_depth: 最大探索深さ（Noneなら空きマス数まで）
+            time_budget: 制限時間（秒、Noneなら無制限）
+            start_depth: 開始深さ（Noneなら置換表から決定）
+            node_limit: 探索ノード数の上限（Noneなら無制限）
+
+        Returns:
+            SearchResult: (最善手, 評価値, 完了した深さ, PV, 探索ノード数)
+            最善手がない（パス）場合の move は None
+        """
+        rows, cols = len(board), len(board[0])
+        self._prepare(rows, cols, time_budget, node_limit)
+        self.trace = []
+        cells = flatten(board)
+
+        empties = cells.count(0)
+        if max_depth is None or max_depth > empties:
+            max_depth = max(1, empties)
+
+        root_entry = self.tt.get(board_key(cells, color))
+        if start_depth is None:
+            start_depth = root_entry[0] if root_entry is not None and root_entry[2] == EXACT else 1
+        start_depth = max(1, min(start_depth, max_depth))
+
+        result = SearchResult(None, 0, 0, [], 0)
+        for depth in range(start_depth, max_depth + 1):
+            depth_start = self.nodes
+            try:
+                score = self._negamax(cells, color, depth, -INF, INF)
+            except SearchAborted:
+                self.trace.append({"depth": depth, "completed": False,
+                                   "nodes": self.nodes - depth_start, "total_nodes": self.nodes})
+                break
+            pv = self.principal_variation(board, color, depth)
+            move = pv[0] if pv else None
+            result = SearchResult(move, score, depth, pv, self.nodes)
+            self.trace.append({"depth": depth, "completed": True, "score": score,
+                               "pv": [list(m) for m in pv],
+                               "nodes": self.nodes - depth_start, "total_nodes": self.nodes})
+
+        if result.depth == 0:
+            # 1つの深さも読み切れなかった場合は、置換表の手（合法なら）か最初の合法手を返す
+            moves = valid_moves(cells, color, self._rays)
+            if moves:
+                square = moves[0]
+                if root_entry is not None and root_entry[3] in moves:
+                    square = root_entry[3]
+                move = (square % cols, square // cols)
+                result = SearchResult(move, 0, 0, [move], self.nodes)
+        return result
+
+    def search_score(self, board, color, depth):
+        """
+        固定の深さで探索した評価値を返す（反復深化・時間制限なし）
+
+        Args:
+            board: 2次元配列のオセロボード
+            color: 手番の色
+            depth: 探索深さ
+
+        Returns:
+            評価値（手番側から見た値）
+        """
+        self._prepare(len(board), len(board[0]), None, None)
+        return self._negamax(flatten(board), color, depth, -INF, INF)
+
+    def principal_variation(self, board, color, depth):
+        """
+        置換表をたどって最善応手列（PV）を取り出す
+
+        Args:
+            board: 2次元配列のオセロボード
+            color: 手番の色
+            depth: たどる最大手数
+
+        Returns:
+            手のリスト [(x, y), ...]（パスは含まない）
+        """
+        cols = len(board[0])
+        rays = get_rays(len(board), cols)
+        cells = flatten(board)
+        pv = []
+        passes = 0
+        while len(pv) < depth and passes < 2:
+            entry = self.tt.get(board_key(cells, color))
+            if entry is None:
+                break
+            square = entry[3]
+            if square is None:
+                # パス局面
+                passes += 1
+                color = 3 - color
+                continue
+            if square not in valid_moves(cells, color, rays):
+                break
+            pv.append((square % cols, square // cols))
+            passes = 0
+            play(cells, color, square, rays)
+            color = 3 - color
+        return pv
+
+    def _prepare(self, rows, cols, time_budget, node_limit):
+        """探索開始時の状態を初期化（停止要求は消さない）"""
+        self._deadline = time.monotonic() + time_budget if time_budget is not None else None
+        self._node_limit = node_limit
+        self.nodes = 0
+        self._next_check = self._next_check_at()
+        self._rays = get_rays(rows, cols)
+        self._weights = get_blended_eval_table(rows, cols)
+        self._probcut_params = get_probcut_params(rows, cols)
+        self._order = seeded_move_order(rows * cols, self.seed) if self.seed is not None else None
+        trim_table_caches()
+
+        config = self.config or get_default_config()
+        self._tt_limit = entry_limit(config.tt_bytes, tt_entry_bytes(rows * cols))
+        if len(self.tt) > self._tt_limit:
+            evict_entries(self.tt, len(self.tt) - self._tt_limit, _entry_depth)
+        self._terminal_limit = terminal_cache_limit(rows * cols, config)
+
+    def _store(self, key, entry):
+        """
+        置換表に記録（上限に達していれば古いエントリを捨ててから）
+
+        記録し直したエントリは末尾に移し、捨てるときは古いエントリのうち探索深さの
+        浅いものから捨てる。深く読んだ局面（根やPVに近い局面）は、探索中に記録し直されなくても残る。
+        """
+        store_entry(self.tt, key, entry, self._tt_limit, _entry_depth)
+
+    def _next_check_at(self):
+        # 停止フラグと制限時間は CHECK_INTERVAL ごとに、ノード数の上限は超えた時点で確認する
+        next_check = self.nodes + CHECK_INTERVAL + 1
+        if self._node_limit is not None:
+            next_check = min(next_check, self._node_limit + 1)
+        return next_check
+
+    def _check_abort(self):
+        if self._node_limit is not None and self.nodes > self._node_limit:
+            raise SearchAborted()
+        if self._stop_event.is_set():
+            raise SearchAborted()
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise SearchAborted()
+        self._next_check = self._next_check_at()
+
+    def _negamax(self, cells, color, depth, alpha, beta, moves=None):
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_abort()
+
+        alpha_orig = alpha
+        key = board_key(cells, color)
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_score
+                elif entry_flag == LOWER:
+                    alpha = max(alpha, entry_score)
+                elif entry_flag == UPPER:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        if depth == 0:
+            # 盤面が埋まった・一方の石がなくなった終局局面は evaluate_position が terminal_score の値を返す
+            return evaluate_position(cells, color, self._weights)
+
+        if (self._selective and depth >= PROBCUT_MIN_DEPTH and not self._in_probcut
+                and self._probcut_params):
+            cut = self._probcut(cells, color, depth, alpha, beta)
+            if cut is not None:
+                return cut
+
+        rays = self._rays
+        if moves is None:
+            moves = valid_moves(cells, color, rays)
+        if not moves:
+            score = cached_terminal_score(self.terminal_cache, cells, color)
+            if score is not None:
+                return score
+            opponent_moves = valid_moves(cells, 3 - color, rays)
+            if not opponent_moves:
+                # ゲーム終了
+                return store_terminal_score(self.terminal_cache, cells, color, self._terminal_limit)
+            # パス（計算した相手の有効手をそのまま使う）
+            score = -self._negamax(cells, 3 - color, depth - 1, -beta, -alpha, opponent_moves)
+            self._store(key, (depth, score, _bound_flag(score, alpha_orig, beta), None))
+            return score
+
+        if self._order is not None:
+            moves.sort(key=self._order.__getitem__)
+
+        # 置換表の手を最初に試す
+        if tt_move in moves:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        best_score = -INF
+        best_move = None
+        for move in moves:
+            flipped = play(cells, color, move, rays)
+            score = -self._negamax(cells, 3 - color, depth - 1, -beta, -alpha)
+            undo(cells, color, move, flipped)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if best_score > alpha:
+                alpha = best_score
+            if alpha >= beta:
+                break
+
+        self._store(key, (depth, best_score, _bound_flag(best_score, alpha_orig, beta), best_move))
+        return best_score
+
+
+    def _probcut(self, cells, color, depth, alpha, beta):
+        """
+        浅い探索で深い探索の結果を予測し、枝刈りできれば境界値を返す
+
+        深い探索の値 v_deep を v_deep ≈ a * v_shallow + b で予測し、
+        予測誤差の標準偏差 sigma の probcut_t 倍の余裕をもって
+        beta 以上（または alpha 以下）と判断できれば、その境界値を返す。
+        予測式は評価関数の値で較正しているため、終局の評価値の境界では使わない。
+        パラメータはボードサイズごとに較正したものを使う（較正していないサイズでは呼ばれない）。
+        """
+        params = self._probcut_params.get((game_phase(cells), depth))
+        if params is None:
+            return None
+        shallow, a, b, sigma = params
+        if a <= 0:
+            return None
+        margin = self.probcut_t * sigma
+
+        self._in_probcut = True
+        try:
+            if beta < INF and not is_terminal_score(beta):
+                bound = math.ceil((beta + margin - b) / a)
+                if self._negamax(cells, color, shallow, bound - 1, bound) >= bound:
+                    return beta
+            if alpha > -INF and not is_terminal_score(alpha):
+                bound = math.floor((alpha - margin - b) / a)
+                if self._negamax(cells, color, shallow, bound, bound + 1) <= bound:
+                    return alpha
+        finally:
+            self._in_probcut = False
+        return None
+
+
+def _entry_depth(entry):
+    """置換表のエントリから探索深さを取り出す"""
+    return entry[0]
+
+
+def _bound_flag(score, alpha, beta):
+    """探索窓に対する評価値の種類（EXACT/LOWER/UPPER）を判定"""
+    if score <= alpha:
+        return UPPER
+    if score >= beta:
+        return LOWER
+    return EXACT
+
+
+def myai_selective(board, color, time_budget=1.0, node_limit=None, seed=None, config=None):
+    """
+    選択的探索AI: ProbCut で枝刈りしながら制限時間内にできるだけ深く読む
+
+    Args:
+        board: 2次元配列のオセロボード
+        color: 自分の色 (BLACK=1, WHITE=2)
+        time_budget: 1手あたりの制限時間（秒）
+        node_limit: 1手あたりの探索ノード数の上限（指定すると制限時間の代わりに使い、
+                    結果は実行環境によらず一定になる）
+        seed: 置換表の手の次に試す手の順を決めるシード
+        config: メモリ設定 EngineConfig（Noneなら既定の設定）
+
+    Returns:
+        (column, row): 最適手
+    """
+    if node_limit is not None:
+        time_budget = None
+    engine = SearchEngine(selective=True, seed=seed, config=config)
+    result = engine.search(board, color, time_budget=time_budget, node_limit=node_limit)
+    return result.move if result.move else (0, 0)
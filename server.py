@@ -0,0 +1,408 @@
+"""
+対局エンジンサーバー
+
+1つのプロセスで多数の対局を同時に処理する常駐型エンジン。
+標準入出力、またはローカルソケット（Unixドメインソケット）で
+1行1メッセージのJSON（JSON Lines）をやり取りする。
+
+リクエスト（1行に1件、または複数件をリストにまとめて1行で送る）:
+    {"id": 1, "game": "g1", "board": [[...]], "color": 1,
+     "player": "search", "time_budget": 0.5}
+
+    player: "search"（置換表付き探索、既定）または myai_* 関数名
+            （myai.py と探索エンジン群の myai_selective・myai_mcts・myai_ponder）
+    time_budget: 1手あたりの制限時間（秒）。myai_* 関数には、引数 time_budget を
+                 持つ場合だけ渡す（持たない関数に指定するとエラー）
+    node_limit: 1手あたりの探索ノード数の上限（指定すると time_budget の
+                既定値は使わず、結果はワーカーの負荷によらず一定になる）。
+                "search" と引数 node_limit を持つ関数（myai_selective）で使える
+
+レスポンス（リクエスト1件ごとに1行、完了した順）:
+    {"id": 1, "game": "g1", "move": [x, y], "score": 12, "depth": 7,
+     "nodes": 5120, "worker": 0, "compute_ms": 480.2, "latency_ms": 481.0}
+
+    エラー時は {"id": 1, "game": "g1", "error": "..."}
+
+対局終了の通知（その対局の置換表を破棄する）:
+    {"id": 2, "game": "g1", "end": true}
+
+同じ対局のリクエストは常に同じワーカープロセスに割り当てるため、
+対局ごとの置換表は手をまたいで再利用される。
+ワーカーごとのメモリ上限（--worker-mb）を対局数上限（--max-games）で割った値が
+対局ごとの置換表と終局局面のキャッシュの上限になり、ワーカーが保持する合計は
+--worker-mb を超えない。
+
+使い方:
+    python server.py --workers 4
+    python server.py --socket /tmp/othello.sock
+    python server.py --max-games 64 --worker-mb 512
+"""
+
+import argparse
+import inspect
+import itertools
+import json
+import multiprocessing
+import os
+import socketserver
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+try:
+    from .benchmark import resolve_players
+    from .engine_config import DEFAULT_TERMINAL_CACHE_BYTES, MB, EngineConfig
+    from .search import SearchEngine
+except ImportError:
+    from benchmark import resolve_players
+    from engine_config import DEFAULT_TERMINAL_CACHE_BYTES, MB, EngineConfig
+    from search import SearchEngine
+
+
+DEFAULT_TIME_BUDGET = 0.5
+DEFAULT_MAX_GAMES = 256
+DEFAULT_WORKER_BYTES = 1024 * MB
+
+
+def resolve_player(name):
+    """
+    プレイヤー名からAI関数を取得
+
+    myai.py のほか、探索エンジン群（myai_selective・myai_mcts・myai_ponder）も探す
+    （benchmark.resolve_players() と同じ）。
+
+    Args:
+        name: myai_* 関数名
+
+    Returns:
+        AI関数
+    """
+    if not name.startswith("myai"):
+        raise ValueError(f"unknown player: {name!r}")
+    return resolve_players([name])[name]
+
+
+def call_player(name, board, color, options):
+    """
+    myai_* 関数で手を決める
+
+    リクエストの time_budget・node_limit は、その名前の引数を持つ関数にだけ渡す。
+    持たない関数に指定した場合は、黙って無視せずにエラーにする。
+
+    Args:
+        name: myai_* 関数名
+        board: 2次元配列のオセロボード
+        color: 手番の色
+        options: {"time_budget": ..., "node_limit": ...}（指定されたものだけ）
+
+    Returns:
+        (x, y): AI関数の返した手
+    """
+    func = resolve_player(name)
+    parameters = inspect.signature(func).parameters
+    for option in options:
+        if option not in parameters:
+            raise ValueError(f"player {name!r} does not accept {option}")
+    return func(board, color, **options)
+
+
+def game_config(worker_bytes=DEFAULT_WORKER_BYTES, max_games=DEFAULT_MAX_GAMES):
+    """
+    ワーカーごとのメモリ上限から対局ごとのメモリ設定を作る
+
+    対局ごとの上限（worker_bytes / max_games）の 1/8（最大で既定値）を終局局面のキャッシュに、
+    残りを置換表に割り当てる。
+
+    Args:
+        worker_bytes: ワーカー1つあたりのメモリ上限（バイト）
+        max_games: ワーカーごとに保持する対局数の上限
+
+    Returns:
+        EngineConfig: 対局ごとの SearchEngine に渡す設定
+    """
+    per_game = worker_bytes // max(1, max_games)
+    terminal_bytes = min(DEFAULT_TERMINAL_CACHE_BYTES, per_game // 8)
+    return EngineConfig(tt_bytes=per_game - terminal_bytes, terminal_cache_bytes=terminal_bytes)
+
+
+def handle_request(request, engines, max_games=DEFAULT_MAX_GAMES, config=None):
+    """
+    リクエストを1件処理する（ワーカープロセス内で実行）
+
+    Args:
+        request: リクエストの辞書
+        engines: 対局ID → SearchEngine の OrderedDict（LRU順）
+        max_games: 保持する対局数の上限
+        config: 対局ごとの SearchEngine に渡すメモリ設定（Noneなら game_config() の既定値）
+
+    Returns:
+        dict: レスポンス（id, game, latency_ms はサーバー側で付加）
+    """
+    game = request.get("game", "")
+    if request.get("end"):
+        engines.pop(game, None)
+        return {"end": True}
+
+    board = request["board"]
+    color = request["color"]
+    player = request.get("player", "search")
+
+    if player != "search":
+        options = {option: request[option] for option in ("time_budget", "node_limit")
+                   if option in request}
+        x, y = call_player(player, board, color, options)
+        return {"move": [x, y]}
+
+    engine = engines.get(game)
+    if engine is None:
+        engine = SearchEngine(config=config if config is not None else game_config(max_games=max_games))
+        engines[game] = engine
+        while len(engines) > max_games:
+            engines.popitem(last=False)
+    else:
+        engines.move_to_end(game)
+
+    node_limit = request.get("node_limit")
+    default_budget = DEFAULT_TIME_BUDGET if node_limit is None else None
+    result = engine.search(board, color,
+                           max_depth=request.get("max_depth"),
+                           time_budget=request.get("time_budget", default_budget),
+                           node_limit=node_limit)
+    move = list(result.move) if result.move is not None else None
+    return {"move": move, "score": result.score, "depth": result.depth, "nodes": result.nodes}
+
+
+def _worker_main(index, task_queue, result_queue, max_games, config=None):
+    """ワーカープロセスのメインループ"""
+    engines = OrderedDict()
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        tag, request = task
+        start = time.perf_counter()
+        try:
+            response = handle_request(request, engines, max_games, config)
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        response["worker"] = index
+        response["compute_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        result_queue.put((tag, response))
+
+
+class EngineService:
+    """
+    ワーカープロセス群にリクエストを割り振るサービス本体
+
+    submit() で受け付けたリクエストの結果は、結果収集スレッドから
+    コールバックで返される。
+    """
+
+    def __init__(self, workers=None, max_games=DEFAULT_MAX_GAMES, config=None,
+                 worker_bytes=DEFAULT_WORKER_BYTES):
+        """
+        Args:
+            workers: ワーカープロセス数（Noneなら CPU 数）
+            max_games: ワーカーごとに置換表を保持する対局数の上限
+            config: 対局ごとのメモリ設定（Noneなら worker_bytes から game_config() で決める）
+            worker_bytes: ワーカー1つあたりのメモリ上限（バイト）
+        """
+        self.num_workers = workers or os.cpu_count() or 1
+        self.max_games = max_games
+        self.config = config if config is not None else game_config(worker_bytes, max_games)
+        self._tags = itertools.count()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._task_queues = []
+        self._processes = []
+        self._result_queue = None
+        self._collector = None
+
+    def start(self):
+        """ワーカープロセスと結果収集スレッドを起動"""
+        self._result_queue = multiprocessing.Queue()
+        for index in range(self.num_workers):
+            task_queue = multiprocessing.Queue()
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(index, task_queue, self._result_queue, self.max_games, self.config),
+                daemon=True)
+            process.start()
+            self._task_queues.append(task_queue)
+            self._processes.append(process)
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    def worker_for(self, game):
+        """対局IDから担当ワーカーの番号を決める（同じ対局は常に同じワーカー）"""
+        return zlib.crc32(str(game).encode("utf-8")) % self.num_workers
+
+    def submit(self, request, callback):
+        """
+        リクエストを受け付ける
+
+        Args:
+            request: リクエストの辞書
+            callback: レスポンスの辞書を受け取る関数
+        """
+        received = time.perf_counter()
+        header = {"id": request.get("id"), "game": request.get("game", "")}
+        if not request.get("end") and ("board" not in request or "color" not in request):
+            callback(dict(header, error="board and color are required", latency_ms=0.0))
+            return
+
+        tag = next(self._tags)
+        with self._lock:
+            self._pending[tag] = (callback, header, received)
+        self._task_queues[self.worker_for(header["game"])].put((tag, request))
+
+    def close(self):
+        """ワーカープロセスを終了する"""
+        for task_queue in self._task_queues:
+            task_queue.put(None)
+        for process in self._processes:
+            process.join()
+        self._result_queue.put(None)
+        self._collector.join()
+
+    def _collect(self):
+        while True:
+            item = self._result_queue.get()
+            if item is None:
+                break
+            tag, response = item
+            with self._lock:
+                callback, header, received = self._pending.pop(tag)
+            response = dict(header, **response)
+            response["latency_ms"] = round((time.perf_counter() - received) * 1000, 3)
+            callback(response)
+
+
+class _Connection:
+    """1本の入出力（標準入出力または1つのソケット接続）への書き込みと未完了数の管理"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._outstanding = 0
+        self._cond = threading.Condition()
+
+    def submit(self, service, line):
+        line = line.strip()
+        if not line:
+            return
+        try:
+            message = json.loads(line)
+        except ValueError as e:
+            self.write({"error": f"invalid JSON: {e}"})
+            return
+        requests = message if isinstance(message, list) else [message]
+        for request in requests:
+            if not isinstance(request, dict):
+                self.write({"error": "request must be a JSON object"})
+                continue
+            with self._cond:
+                self._outstanding += 1
+            service.submit(request, self._reply)
+
+    def write(self, response):
+        data = json.dumps(response, separators=(",", ":")) + "\n"
+        with self._cond:
+            self.stream.write(data)
+            self.stream.flush()
+
+    def wait_idle(self):
+        with self._cond:
+            while self._outstanding:
+                self._cond.wait()
+
+    def _reply(self, response):
+        try:
+            self.write(response)
+        except (OSError, ValueError):
+            pass  # 接続が切れている
+        with self._cond:
+            self._outstanding -= 1
+            self._cond.notify_all()
+
+
+class _TextWriter:
+    """バイナリストリームに文字列を書き込むための薄いラッパー"""
+
+    def __init__(self, binary):
+        self.binary = binary
+
+    def write(self, text):
+        self.binary.write(text.encode("utf-8"))
+
+    def flush(self):
+        self.binary.flush()
+
+
+def serve_stdio(service, stdin=None, stdout=None):
+    """
+    標準入出力でリクエストを処理する（入力が終わるまで）
+
+    Args:
+        service: 起動済みの EngineService
+        stdin: 入力ストリーム（省略時は sys.stdin）
+        stdout: 出力ストリーム（省略時は sys.stdout）
+    """
+    connection = _Connection(stdout or sys.stdout)
+    for line in stdin or sys.stdin:
+        connection.submit(service, line)
+    connection.wait_idle()
+
+
+def serve_socket(service, path):
+    """
+    Unixドメインソケットでリクエストを処理する（KeyboardInterruptまで）
+
+    Args:
+        service: 起動済みの EngineService
+        path: ソケットファイルのパス
+    """
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            connection = _Connection(_TextWriter(self.wfile))
+            for raw in self.rfile:
+                connection.submit(service, raw.decode("utf-8"))
+            connection.wait_idle()
+
+    if os.path.exists(path):
+        os.unlink(path)
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    os.unlink(path)
+
+
+def main(argv=None):
+    """コマンドラインのエントリポイント"""
+    parser = argparse.ArgumentParser(description="オセロAI 対局エンジンサーバー")
+    parser.add_argument("--workers", type=int, default=None, help="ワーカープロセス数（既定: CPU数）")
+    parser.add_argument("--max-games", type=int, default=DEFAULT_MAX_GAMES,
+                        help="ワーカーごとに置換表を保持する対局数")
+    parser.add_argument("--worker-mb", type=float, default=DEFAULT_WORKER_BYTES / MB,
+                        help="ワーカーごとの置換表・終局局面のキャッシュの合計の上限（MB）")
+    parser.add_argument("--socket", default=None, help="Unixドメインソケットのパス（省略時は標準入出力）")
+    args = parser.parse_args(argv)
+
+    service = EngineService(workers=args.workers, max_games=args.max_games,
+                            worker_bytes=int(args.worker_mb * MB))
+    service.start()
+    try:
+        if args.socket:
+            serve_socket(service, args.socket)
+        else:
+            serve_stdio(service)
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
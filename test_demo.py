@@ -5,9 +5,10 @@ Google Colab以外の環境でAIの動作確認を行う
 
 from othello_utils import create_initial_board, print_board, can_place_x_y, move_stone, count_stones, is_game_over
 from myai import myai_greedy_simple, myai_positional, myai_strategic
+from gamerecord import GameRecorder
 
 
-def demo_ai_vs_ai(ai1, ai2, ai1_name="AI1", ai2_name="AI2", board_size=6):
+def demo_ai_vs_ai(ai1, ai2, ai1_name="AI1", ai2_name="AI2", board_size=6, record_path=None):
     """
     AI同士の対戦デモ
 
@@ -17,11 +18,13 @@ def demo_ai_vs_ai(ai1, ai2, ai1_name="AI1", ai2_name="AI2", board_size=6):
         ai1_name: 先手AIの名前
         ai2_name: 後手AIの名前
         board_size: ボードサイズ
+        record_path: 棋譜を追記するファイル（Noneなら保存しない）
     """
     print(f"=== {ai1_name} vs {ai2_name} ===")
     board = create_initial_board(board_size)
     current_player = 1  # 黒から開始
     move_count = 0
+    recorder = GameRecorder(board_size)
 
     print("初期盤面:")
     print_board(board)
@@ -45,6 +48,7 @@ def demo_ai_vs_ai(ai1, ai2, ai1_name="AI1", ai2_name="AI2", board_size=6):
             # 手を実行
             if can_place_x_y(board, current_player, x, y):
                 move_stone(board, current_player, x, y)
+                recorder.add(x, y)
                 print(f"{player_name}（{'●' if current_player == 1 else '○'}）: ({x}, {y})")
                 move_count += 1
 
@@ -56,8 +60,10 @@ def demo_ai_vs_ai(ai1, ai2, ai1_name="AI1", ai2_name="AI2", board_size=6):
                     print()
             else:
                 print(f"警告: {player_name}が無効な手を選択 ({x}, {y})")
+                recorder.add_pass()
         else:
             print(f"{current_player}（{'●' if current_player == 1 else '○'}）はパス")
+            recorder.add_pass()
 
         # プレイヤー交代
         current_player = 3 - current_player
@@ -77,6 +83,9 @@ def demo_ai_vs_ai(ai1, ai2, ai1_name="AI1", ai2_name="AI2", board_size=6):
     print("=" * 40)
     print()
 
+    if record_path:
+        recorder.save(record_path, board, finished=is_game_over(board))
+
 
 def test_single_ai(ai_func, ai_name="AI"):
     """